@@ -97,6 +97,7 @@ from forecast.calendar import _default_db_path
 from budget_health_analyzer import BudgetHealthAnalyzer
 from forecast.calendar import expand_calendar, compute_balances
 from api.forecast import compute_opening_balance_cents
+from forecast.calendar import min_balance
 from q import queries as Q
 
 # --- Tool Input Schemas and Bindings ---
@@ -557,13 +558,7 @@ def forecast_calendar(input: ForecastCalendarInput):
     opening = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=acc_set)
     entries = expand_calendar(input.start, input.end, db_path=dbp, accounts=acc_set)
     balances = compute_balances(opening, entries)
-    min_balance_cents = None
-    min_balance_date = None
-    if balances:
-        for d in sorted(balances.keys()):
-            if min_balance_cents is None or balances[d] < min_balance_cents:
-                min_balance_cents = balances[d]
-                min_balance_date = d
+    min_balance_cents, min_balance_date = min_balance(balances)
     return {
         "opening_balance_cents": int(opening),
         "balances": {d.isoformat(): int(v) for d, v in balances.items()},
@@ -598,28 +593,11 @@ def forecast_history(input: ForecastHistoryInput):
     opening_as_of = input.start - timedelta(days=1)
     acc_set = set(input.accounts) if input.accounts else None
     opening = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=acc_set)
-    # Build deltas via helper, with account filter path when provided
+    # Build deltas via helper (ISO date keys), with account filter when provided
     conn = sqlite3.connect(dbp)
     conn.row_factory = sqlite3.Row
     try:
-        if acc_set:
-            qmarks = ",".join(["?"] * len(acc_set))
-            rows = conn.execute(
-                f"""
-                SELECT DATE(t.posted_at) AS d, COALESCE(SUM(t.amount_cents), 0) AS delta
-                FROM transactions t
-                JOIN accounts a ON a.id = t.account_id
-                WHERE a.is_active = 1 AND t.is_cleared = 1
-                  AND a.id IN ({qmarks})
-                  AND DATE(t.posted_at) >= ? AND DATE(t.posted_at) <= ?
-                GROUP BY DATE(t.posted_at)
-                ORDER BY DATE(t.posted_at)
-                """,
-                (*[int(x) for x in sorted(acc_set)], input.start.isoformat(), input.end.isoformat()),
-            ).fetchall()
-            deltas = {date.fromisoformat(str(r["d"])): int(r["delta"]) for r in rows}
-        else:
-            deltas = _ledger_daily_deltas(conn, input.start, input.end)
+        deltas = _ledger_daily_deltas(conn, input.start, input.end, acc_set)
     finally:
         conn.close()
 
@@ -627,8 +605,9 @@ def forecast_history(input: ForecastHistoryInput):
     running = int(opening)
     d = input.start
     while d <= input.end:
-        running = running + int(deltas.get(d, 0))
-        balances[d.isoformat()] = running
+        key = d.isoformat()
+        running = running + int(deltas.get(key, 0))
+        balances[key] = running
         d = d + timedelta(days=1)
     return {
         "opening_balance_cents": int(opening),
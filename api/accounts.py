@@ -1,29 +1,80 @@
 from __future__ import annotations
 
-from pathlib import Path
-import sqlite3
+from typing import Optional
+
 from fastapi import APIRouter, HTTPException, Request
+from pydantic import field_validator
+
+from api.bodies import JsonBody, parse_json_body
 from security.deps import require_auth, require_csrf, rate_limit
 import os
+import re
 from forecast.calendar import _default_db_path
+from db import pool as db_pool
 from datetime import date as _date
 
 router = APIRouter()
 
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Constant SQL text so pooled connections reuse their cached prepared statements
+_SQL_LIST_ACCOUNTS = "SELECT id, name, type, currency, is_active FROM accounts ORDER BY is_active DESC, name ASC"
+_SQL_LIST_ANCHORS = (
+    "SELECT account_id, anchor_date, anchor_balance_cents, COALESCE(min_floor_cents, 0) AS min_floor_cents "
+    "FROM account_anchors"
+)
+
+
+_ISO_DATE = re.compile(r"([0-9]{4})-([0-9]{2})-([0-9]{2})")
+
+
+def _iso_date(v: str) -> str:
+    """Strictly YYYY-MM-DD; the date() constructor range-checks the parts."""
+    v = v.strip()
+    m = _ISO_DATE.fullmatch(v)
+    if not m:
+        raise ValueError("expected YYYY-MM-DD")
+    _date(*map(int, m.groups()))
+    return v
+
+
+class AnchorBody(JsonBody):
+    anchor_date: str
+    anchor_balance_cents: int
+    min_floor_cents: Optional[int] = None
+
+    error_messages = {
+        "anchor_date": "'anchor_date' must be YYYY-MM-DD",
+        "anchor_balance_cents": "'anchor_balance_cents' must be integer cents",
+        "min_floor_cents": "'min_floor_cents' must be integer cents",
+    }
+
+    @field_validator("anchor_date")
+    @classmethod
+    def _check_anchor_date(cls, v: str) -> str:
+        return _iso_date(v)
+
+
+class ReconcileBody(JsonBody):
+    actual_balance_cents: int
+    as_of: Optional[str] = None
+
+    error_messages = {
+        "actual_balance_cents": "'actual_balance_cents' must be integer cents",
+        "as_of": "'as_of' must be YYYY-MM-DD if provided",
+    }
+
+    @field_validator("as_of")
+    @classmethod
+    def _check_as_of(cls, v: Optional[str]) -> Optional[str]:
+        return _iso_date(v) if v and v.strip() else None
 
 
 @router.get("/api/accounts")
-def list_accounts():
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
-        rows = conn.execute(
-            "SELECT id, name, type, currency, is_active FROM accounts ORDER BY is_active DESC, name ASC"
-        ).fetchall()
+async def list_accounts():
+    def _query(conn):
+        return conn.execute(_SQL_LIST_ACCOUNTS).fetchall()
+
+    rows = await db_pool.run(_default_db_path(), _query)
     return {
         "accounts": [
             {
@@ -68,23 +119,22 @@ def get_account_overdraft_alert_thresholds():
 
 
 @router.get("/api/accounts/anchors")
-def list_account_anchors():
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
-        rows = conn.execute(
-            "SELECT account_id, anchor_date, anchor_balance_cents, COALESCE(min_floor_cents, 0) AS min_floor_cents FROM account_anchors"
-        ).fetchall()
-        return {
-            "anchors": [
-                {
-                    "account_id": int(r["account_id"]),
-                    "anchor_date": r["anchor_date"],
-                    "anchor_balance_cents": int(r["anchor_balance_cents"]),
-                    "min_floor_cents": int(r["min_floor_cents"]),
-                }
-                for r in rows
-            ]
-        }
+async def list_account_anchors():
+    def _query(conn):
+        return conn.execute(_SQL_LIST_ANCHORS).fetchall()
+
+    rows = await db_pool.run(_default_db_path(), _query)
+    return {
+        "anchors": [
+            {
+                "account_id": int(r["account_id"]),
+                "anchor_date": r["anchor_date"],
+                "anchor_balance_cents": int(r["anchor_balance_cents"]),
+                "min_floor_cents": int(r["min_floor_cents"]),
+            }
+            for r in rows
+        ]
+    }
 
 
 @router.put("/api/accounts/{account_id}/anchor")
@@ -97,47 +147,28 @@ async def upsert_account_anchor(account_id: int, request: Request):
     require_auth(request)
     require_csrf(request)
     rate_limit(request, scope="anchors-write")
-    try:
-        payload = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
-
-    try:
-        ad_raw = (payload.get("anchor_date") or "").strip()
-        from datetime import date
-
-        # Validate format
-        date.fromisoformat(ad_raw)
-    except Exception:
-        raise HTTPException(status_code=400, detail="'anchor_date' must be YYYY-MM-DD")
-    try:
-        bal = int(payload.get("anchor_balance_cents"))
-    except Exception:
-        raise HTTPException(status_code=400, detail="'anchor_balance_cents' must be integer cents")
-    mfc = payload.get("min_floor_cents")
-    try:
-        mfc_int = int(mfc) if mfc is not None else None
-    except Exception:
-        raise HTTPException(status_code=400, detail="'min_floor_cents' must be integer cents")
-
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
-        # Ensure account exists
-        row = conn.execute("SELECT 1 FROM accounts WHERE id=?", (account_id,)).fetchone()
-        if not row:
-            raise HTTPException(status_code=404, detail="Account not found")
-        conn.execute(
+    body = await parse_json_body(request, AnchorBody)
+    ad_raw = body.anchor_date
+    bal = body.anchor_balance_cents
+    mfc_int = body.min_floor_cents
+
+    def _write(conn) -> int:
+        # Inserts nothing when the account does not exist
+        cur = conn.execute(
             """
             INSERT INTO account_anchors(account_id, anchor_date, anchor_balance_cents, min_floor_cents)
-            VALUES(?,?,?,?)
+            SELECT ?,?,?,? WHERE EXISTS (SELECT 1 FROM accounts WHERE id=?)
             ON CONFLICT(account_id) DO UPDATE SET
                 anchor_date=excluded.anchor_date,
                 anchor_balance_cents=excluded.anchor_balance_cents,
                 min_floor_cents=excluded.min_floor_cents
             """,
-            (account_id, ad_raw, bal, mfc_int),
+            (account_id, ad_raw, bal, mfc_int, account_id),
         )
-        conn.commit()
+        return cur.rowcount
+
+    if await db_pool.run(_default_db_path(), _write, write=True) == 0:
+        raise HTTPException(status_code=404, detail="Account not found")
     return {
         "account_id": account_id,
         "anchor_date": ad_raw,
@@ -158,29 +189,16 @@ async def reconcile_account_balance(account_id: int, request: Request):
     require_auth(request)
     require_csrf(request)
     rate_limit(request, scope="anchors-write")
-    try:
-        payload = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
+    body = await parse_json_body(request, ReconcileBody)
+    bal = body.actual_balance_cents
 
-    try:
-        bal = int(payload.get("actual_balance_cents"))
-    except Exception:
-        raise HTTPException(status_code=400, detail="'actual_balance_cents' must be integer cents")
-
-    as_of_raw = (payload.get("as_of") or "").strip()
-    if as_of_raw:
-        try:
-            as_of = _date.fromisoformat(as_of_raw)
-        except Exception:
-            raise HTTPException(status_code=400, detail="'as_of' must be YYYY-MM-DD if provided")
+    if body.as_of:
+        as_of_raw = body.as_of
     else:
         # Use local/tz-agnostic date; consistent with server date storage
-        as_of = _date.today()
-        as_of_raw = as_of.isoformat()
+        as_of_raw = _date.today().isoformat()
 
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
+    def _write(conn):
         # Ensure account exists
         row = conn.execute("SELECT 1 FROM accounts WHERE id=?", (account_id,)).fetchone()
         if not row:
@@ -202,7 +220,9 @@ async def reconcile_account_balance(account_id: int, request: Request):
             """,
             (account_id, as_of_raw, bal, mfc_val),
         )
-        conn.commit()
+        return mfc_val
+
+    mfc_val = await db_pool.run(_default_db_path(), _write, write=True)
 
     return {
         "account_id": int(account_id),
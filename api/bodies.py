@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import ClassVar, Dict, Type, TypeVar
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ConfigDict, ValidationError
+
+
+class JsonBody(BaseModel):
+    """Base for JSON request bodies parsed inside handlers.
+
+    Handlers run auth/CSRF/rate-limit checks first and only then parse the body,
+    so bodies are not declared as FastAPI parameters. Subclasses map field names
+    to the 400 detail returned when that field fails validation.
+    """
+
+    model_config = ConfigDict(extra="ignore")
+
+    error_messages: ClassVar[Dict[str, str]] = {}
+
+
+B = TypeVar("B", bound=JsonBody)
+
+
+async def parse_json_body(request: Request, model: Type[B]) -> B:
+    """Parse and validate the request body in one pass (pydantic-core JSON parser).
+
+    Raises HTTPException(400) with the model's field message, the validator's
+    message for model-level checks, or "Invalid JSON body" for malformed input.
+    """
+    raw = await request.body()
+    try:
+        return model.model_validate_json(raw)
+    except ValidationError as exc:
+        err = exc.errors(include_url=False)[0]
+        loc = err.get("loc") or ()
+        if err.get("type") == "json_invalid" or (not loc and err.get("type") == "model_type"):
+            detail = "Invalid JSON body"
+        elif loc and str(loc[0]) in model.error_messages:
+            detail = model.error_messages[str(loc[0])]
+        elif err.get("type") == "value_error":
+            detail = str(err.get("ctx", {}).get("error") or err.get("msg"))
+        else:
+            detail = f"Invalid '{loc[0]}'" if loc else "Invalid JSON body"
+        raise HTTPException(status_code=400, detail=detail)
@@ -4,7 +4,7 @@ from datetime import date, datetime, timedelta
 from typing import Optional, Iterable
 
 from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 
 from forecast.calendar import expand_calendar, _default_db_path
 
@@ -29,48 +29,63 @@ def _ical_date(d: date) -> str:
     return d.strftime("%Y%m%d")
 
 
+_ICAL_HEADER = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    "PRODID:-//Budget Buddy//Calendar Export//EN\r\n"
+    "CALSCALE:GREGORIAN\r\n"
+    "METHOD:PUBLISH\r\n"
+)
+_ICAL_FOOTER = "END:VCALENDAR\r\n"
+_SUMMARY_TYPES = {"commitment": "Commitment", "key_event": "Key Event"}
+# Events per streamed chunk; keeps sends few without buffering the whole file
+_ICAL_EVENTS_PER_CHUNK = 64
+# Ranges up to this many days are rendered eagerly and sent with Content-Length
+# (well under 1 MB in practice); longer exports keep streaming.
+_ICAL_EAGER_MAX_DAYS = 400
+
+
+def _ical_event(e, dtstamp: str) -> str:
+    """One VEVENT block (all-day; DTEND exclusive) as a single string."""
+    label = _SUMMARY_TYPES[e.type]
+    return "".join(
+        (
+            "BEGIN:VEVENT\r\n",
+            f"UID:{e.type}-{e.source_id}-{e.date.isoformat()}@budgetbuddy\r\n",
+            dtstamp,
+            f"DTSTART;VALUE=DATE:{_ical_date(e.date)}\r\n",
+            f"DTEND;VALUE=DATE:{_ical_date(e.date + timedelta(days=1))}\r\n",
+            f"SUMMARY:{label}: {e.name}\r\n",
+            # Escape commas and semicolons minimally per iCal text rules
+            f"DESCRIPTION:Type: {e.type}\\n"
+            f"Amount: {_money(e.amount_cents)}\\n"
+            f"Shift policy: {e.policy or 'AS_SCHEDULED'}\\n"
+            f"Shift applied: {str(bool(e.shift_applied)).lower()}\r\n",
+            f"CATEGORIES:{label}\r\n",
+            "END:VEVENT\r\n",
+        )
+    )
+
+
 def _generate_ical(start: date, end: date) -> Iterable[str]:
-    # Header
-    yield "BEGIN:VCALENDAR\r\n"
-    yield "VERSION:2.0\r\n"
-    yield "PRODID:-//Budget Buddy//Calendar Export//EN\r\n"
-    yield "CALSCALE:GREGORIAN\r\n"
-    yield "METHOD:PUBLISH\r\n"
+    yield _ICAL_HEADER
 
     # Load entries and filter to commitments + key events
     dbp = _default_db_path()
     entries = expand_calendar(start, end, db_path=dbp)
-    now = datetime.utcnow()
+    dtstamp = f"DTSTAMP:{_ical_dt(datetime.utcnow())}\r\n"
+    chunk: list[str] = []
     for e in entries:
-        if e.type not in ("commitment", "key_event"):
+        if e.type not in _SUMMARY_TYPES:
             continue
-        uid = f"{e.type}-{e.source_id}-{e.date.isoformat()}@budgetbuddy"
-        summary_type = "Commitment" if e.type == "commitment" else "Key Event"
-        # Build VEVENT
-        yield "BEGIN:VEVENT\r\n"
-        yield f"UID:{uid}\r\n"
-        yield f"DTSTAMP:{_ical_dt(now)}\r\n"
-        # All-day event: DTSTART/DTEND as VALUE=DATE (DTEND exclusive)
-        yield f"DTSTART;VALUE=DATE:{_ical_date(e.date)}\r\n"
-        yield f"DTEND;VALUE=DATE:{_ical_date(e.date + timedelta(days=1))}\r\n"
-        # Summary and description
-        summary = f"{summary_type}: {e.name}"
-        yield f"SUMMARY:{summary}\r\n"
-        amount = _money(e.amount_cents)
-        # Escape commas and semicolons minimally per iCal text rules
-        desc = (
-            f"Type: {e.type}\\n"
-            f"Amount: {amount}\\n"
-            f"Shift policy: {e.policy or 'AS_SCHEDULED'}\\n"
-            f"Shift applied: {str(bool(e.shift_applied)).lower()}"
-        )
-        yield f"DESCRIPTION:{desc}\r\n"
-        cat = "Commitment" if e.type == "commitment" else "Key Event"
-        yield f"CATEGORIES:{cat}\r\n"
-        yield "END:VEVENT\r\n"
+        chunk.append(_ical_event(e, dtstamp))
+        if len(chunk) >= _ICAL_EVENTS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield "".join(chunk)
 
-    # Footer
-    yield "END:VCALENDAR\r\n"
+    yield _ICAL_FOOTER
 
 
 @router.get("/api/calendar/ical")
@@ -87,10 +102,9 @@ def get_calendar_ical(
         raise HTTPException(status_code=400, detail="to must be on or after from")
 
     filename = f"budget_calendar_{start.isoformat()}_{end.isoformat()}.ics"
-    stream = _generate_ical(start, end)
-    return StreamingResponse(
-        stream,
-        media_type="text/calendar; charset=utf-8",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
-
+    media_type = "text/calendar; charset=utf-8"
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if (end - start).days <= _ICAL_EAGER_MAX_DAYS:
+        body = "".join(_generate_ical(start, end)).encode("utf-8")
+        return Response(content=body, media_type=media_type, headers=headers)
+    return StreamingResponse(_generate_ical(start, end), media_type=media_type, headers=headers)
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 import os
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Body
+from starlette.concurrency import run_in_threadpool
 
-from classification.suggester import suggest, extract_csv_category
+from classification.suggester import suggest, suggest_batch, extract_csv_category
+from db import pool as db_pool
 
 
 router = APIRouter()
@@ -18,10 +21,8 @@ def _default_db_path() -> Path:
     return Path(env) if env else Path("localdb/budget.db")
 
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+def _connect(db_path: Path, *, write: bool = False):
+    return db_pool.connect(db_path, write=write)
 
 
 def _ensure_holding_category(conn: sqlite3.Connection) -> int:
@@ -39,16 +40,24 @@ def _ensure_holding_category(conn: sqlite3.Connection) -> int:
     return int(cur.lastrowid)
 
 
+@lru_cache(maxsize=8)
+def _cached_holding_id(db_path_str: str) -> int:
+    """Holding category id per DB; the row is system-reserved and never deleted (see api/categories.py)."""
+    with _connect(Path(db_path_str), write=True) as conn:
+        return _ensure_holding_category(conn)
+
+
 @router.get("/api/classify/unmapped")
-def list_unmapped(limit: int = 50) -> Dict[str, Any]:
+async def list_unmapped(limit: int = 50) -> Dict[str, Any]:
     """Return recent transactions mapped to Holding with a suggestion candidate.
 
     Focus on CSV-imported transactions (source='ynab-csv') for actionable mapping via category_map.
     """
     dbp = _default_db_path()
-    out: List[Dict[str, Any]] = []
-    with _connect(dbp) as conn:
-        holding_id = _ensure_holding_category(conn)
+
+    holding_id = await run_in_threadpool(_cached_holding_id, str(dbp))
+
+    def _query(conn) -> List[Dict[str, Any]]:
         cur = conn.execute(
             """
             SELECT idempotency_key, posted_at, payee, memo, source, import_meta_json
@@ -59,23 +68,29 @@ def list_unmapped(limit: int = 50) -> Dict[str, Any]:
             """,
             (holding_id, int(limit)),
         )
-        for r in cur.fetchall():
-            csv_cat = extract_csv_category(r["import_meta_json"]) if r["source"] == "ynab-csv" else None
-            s = suggest(dbp, payee=r["payee"], memo=r["memo"], csv_category=csv_cat)
-            out.append(
-                {
-                    "idempotency_key": r["idempotency_key"],
-                    "posted_at": r["posted_at"],
-                    "payee": r["payee"],
-                    "memo": r["memo"],
-                    "source": r["source"],
-                    "csv_category": csv_cat,
-                    "suggested_category_id": s.category_id,
-                    "suggested_category_name": s.category_name,
-                    "confidence": s.confidence,
-                    "notes": s.notes,
-                }
-            )
+        return [
+            {
+                "idempotency_key": r["idempotency_key"],
+                "posted_at": r["posted_at"],
+                "payee": r["payee"],
+                "memo": r["memo"],
+                "source": r["source"],
+                "csv_category": extract_csv_category(r["import_meta_json"]) if r["source"] == "ynab-csv" else None,
+            }
+            for r in cur.fetchall()
+        ]
+
+    out = await db_pool.run(dbp, _query)
+    suggestions = await run_in_threadpool(suggest_batch, dbp, out)
+    for item, s in zip(out, suggestions):
+        item.update(
+            {
+                "suggested_category_id": s.category_id,
+                "suggested_category_name": s.category_name,
+                "confidence": s.confidence,
+                "notes": s.notes,
+            }
+        )
     return {"count": len(out), "items": out}
 
 
@@ -91,21 +106,14 @@ def get_suggestion(payee: Optional[str] = None, memo: Optional[str] = None, csv_
 
 
 def _upsert_category_map(conn: sqlite3.Connection, *, source: str, external_id: str, internal_category_id: int) -> None:
-    # Update if exists
-    cur = conn.execute(
-        "SELECT internal_category_id FROM category_map WHERE source = ? AND external_id = ?",
-        (source, external_id),
-    )
-    row = cur.fetchone()
-    if row:
-        if int(row[0]) != internal_category_id:
-            conn.execute(
-                "UPDATE category_map SET internal_category_id = ? WHERE source = ? AND external_id = ?",
-                (internal_category_id, source, external_id),
-            )
-        return
+    # Relies on uq_category_map_source_external; unchanged mappings are left untouched
     conn.execute(
-        "INSERT INTO category_map(source, external_id, internal_category_id) VALUES(?,?,?)",
+        """
+        INSERT INTO category_map(source, external_id, internal_category_id) VALUES(?,?,?)
+        ON CONFLICT(source, external_id) DO UPDATE SET
+            internal_category_id = excluded.internal_category_id
+        WHERE internal_category_id != excluded.internal_category_id
+        """,
         (source, external_id, internal_category_id),
     )
 
@@ -131,7 +139,7 @@ def accept_suggestion(
     generalize = bool(payload.get("generalize", False))
 
     if mapping_source and external_id and isinstance(internal_category_id, int):
-        with _connect(dbp) as conn:
+        with _connect(dbp, write=True) as conn:
             # Validate internal category exists
             cur = conn.execute("SELECT name FROM categories WHERE id = ?", (internal_category_id,))
             row = cur.fetchone()
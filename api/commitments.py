@@ -1,81 +1,198 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Optional
 from datetime import date as _date
-import sqlite3
 
 from fastapi import APIRouter, HTTPException, Request
+from pydantic import model_validator
 
+from api.bodies import JsonBody, parse_json_body
+
+from db import pool as db_pool
 from forecast.calendar import _default_db_path
 from security.deps import require_auth, require_csrf, rate_limit
 
 
 router = APIRouter()
 
+_COMMITMENT_COLUMNS = (
+    "id, name, amount_cents, due_rule, next_due_date, priority, account_id, flexible_window_days, category_id, type"
+)
+
+# Whitelist of columns update_commitment may set, with their SET fragments
+_UPDATABLE = {
+    col: f"{col} = ?"
+    for col in (
+        "name",
+        "amount_cents",
+        "due_rule",
+        "next_due_date",
+        "priority",
+        "account_id",
+        "flexible_window_days",
+        "category_id",
+        "type",
+    )
+}
+
+
+# Monthly-equivalent multiplier per due rule as an exact (numerator, denominator).
+# Every query computes it with the one _MONTHLY_EQUIV_SQL expression, so list
+# totals match per-item values exactly.
+_MONTHLY_FACTORS = {
+    "MONTHLY": (1, 1),
+    "MONTHLY_BY_DATE": (1, 1),
+    "WEEKLY": (52, 12),
+    "BIWEEKLY": (26, 12),
+    "ANNUAL": (1, 12),
+    "YEARLY": (1, 12),
+}
+
+# Multiply in integers first and divide once: the quotient of an exact .5 tie is
+# representable, so ROUND() sees it and rounds half away from zero. A float factor
+# such as 26/12 would turn 12345 * 26/12 = 26747.5 into 26747.4999...
+_MONTHLY_EQUIV_SQL = (
+    "CAST(CASE UPPER(TRIM(COALESCE(due_rule, 'MONTHLY')))"
+    + "".join(
+        f" WHEN '{rule}' THEN ROUND(amount_cents * {num} / {den}.0)"
+        for rule, (num, den) in _MONTHLY_FACTORS.items()
+        if num != den
+    )
+    + " ELSE amount_cents END AS INTEGER)"
+)
+
+# Written row plus its monthly equivalent, so write responses need no Python recompute
+_RETURNING_COLUMNS = f"{_COMMITMENT_COLUMNS}, {_MONTHLY_EQUIV_SQL} AS meq"
+
+_SQL_LIST_COMMITMENTS = f"""
+    SELECT id, name, COALESCE(amount_cents, 0) AS amount_cents, due_rule, next_due_date, priority,
+           account_id, flexible_window_days, category_id, type,
+           COALESCE({_MONTHLY_EQUIV_SQL}, 0) AS meq
+    FROM commitments
+    ORDER BY name ASC, id ASC
+"""
+
+_SQL_COMMITMENT_TOTALS = f"""
+    SELECT COUNT(*) AS n,
+           COALESCE(SUM(amount_cents), 0) AS total_cents,
+           COALESCE(SUM({_MONTHLY_EQUIV_SQL}), 0) AS meq
+    FROM commitments
+"""
+
+
+@lru_cache(maxsize=128)
+def _update_sql(cols: tuple[str, ...], check_account: bool = False) -> str:
+    """UPDATE statement for one shape of partial update (keys in handler order).
+
+    With check_account the row is only updated when the account bound after the
+    id exists, so a bad account_id changes nothing and returns no row.
+    """
+    sets = ", ".join(_UPDATABLE[c] for c in cols)
+    guard = " AND EXISTS (SELECT 1 FROM accounts WHERE id = ?)" if check_account else ""
+    return f"UPDATE commitments SET {sets} WHERE id = ?{guard} RETURNING {_RETURNING_COLUMNS}"
+
+
+class CommitmentFields(JsonBody):
+    """Commitment body fields; every field optional, as for partial updates."""
+
+    name: Optional[str] = None
+    amount_cents: Optional[int] = None
+    amount_eur: Optional[float] = None
+    due_rule: Optional[str] = None
+    next_due_date: Optional[str] = None
+    account_id: Optional[int] = None
+    priority: Optional[int] = None
+    flexible_window_days: Optional[int] = None
+    category_id: Optional[int] = None
+    type: Optional[str] = None
+
+    error_messages = {
+        "amount_cents": "Invalid amount",
+        "amount_eur": "Invalid amount",
+        "account_id": "'account_id' must be an integer",
+        "priority": "'priority' must be integer",
+        "flexible_window_days": "'flexible_window_days' must be integer",
+        "category_id": "'category_id' must be integer",
+    }
+
+    def amount_cents_value(self) -> Optional[int]:
+        if self.amount_cents is not None:
+            return self.amount_cents
+        if self.amount_eur is not None:
+            return int(round(self.amount_eur * 100.0))
+        return None
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
 
+class CommitmentCreate(CommitmentFields):
+    @model_validator(mode="after")
+    def _check_required(self) -> "CommitmentCreate":
+        self.name = (self.name or "").strip()
+        if not self.name:
+            raise ValueError("'name' is required")
+        if self.amount_cents is None and self.amount_eur is None:
+            raise ValueError("Provide amount_cents or amount_eur")
+        return self
 
-def _monthly_equivalent_cents(amount_cents: int, due_rule: Optional[str]) -> int:
-    if amount_cents is None:
-        return 0
-    rule = (due_rule or "MONTHLY").strip().upper()
-    if rule in ("MONTHLY", "MONTHLY_BY_DATE"):
-        return int(amount_cents)
-    if rule == "WEEKLY":
-        return int(round(amount_cents * (52.0 / 12.0)))
-    if rule == "BIWEEKLY":
-        return int(round(amount_cents * (26.0 / 12.0)))
-    if rule in ("ANNUAL", "YEARLY"):
-        return int(round(amount_cents / 12.0))
-    # Fallback: treat as monthly
-    return int(amount_cents)
+
+def _commitment_item(row) -> dict:
+    """Response shape for a row selected/returned with _RETURNING_COLUMNS."""
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "amount_cents": row["amount_cents"],
+        "due_rule": row["due_rule"],
+        "next_due_date": row["next_due_date"],
+        "priority": row["priority"],
+        "account_id": row["account_id"],
+        "flexible_window_days": row["flexible_window_days"],
+        "category_id": row["category_id"],
+        "type": row["type"],
+        "monthly_equivalent_cents": row["meq"],
+    }
 
 
 @router.get("/api/commitments")
-def list_commitments():
+async def list_commitments(summary_only: bool = False):
     """List confirmed recurring commitments with a running total and monthly equivalent total.
 
     Returns JSON with items, total_cents (raw sum), monthly_equivalent_cents (normalized), and count.
+    With summary_only=1 the items are omitted and totals come from a single SQL aggregate.
     """
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
-        rows = conn.execute(
-            """
-            SELECT id, name, amount_cents, due_rule, next_due_date, priority,
-                   account_id, flexible_window_days, category_id, type
-            FROM commitments
-            ORDER BY name ASC, id ASC
-            """
-        ).fetchall()
-
-    items = []
-    total_cents = 0
-    total_monthly_equiv = 0
-    for r in rows:
-        amt = int(r["amount_cents"]) if r["amount_cents"] is not None else 0
-        total_cents += amt
-        meq = _monthly_equivalent_cents(amt, r["due_rule"])
-        total_monthly_equiv += meq
-        items.append(
-            {
-                "id": int(r["id"]),
-                "name": r["name"],
-                "amount_cents": amt,
-                "due_rule": r["due_rule"],
-                "monthly_equivalent_cents": meq,
-                "next_due_date": r["next_due_date"],
-                "priority": int(r["priority"]) if r["priority"] is not None else None,
-                "account_id": int(r["account_id"]) if r["account_id"] is not None else None,
-                "flexible_window_days": int(r["flexible_window_days"]) if r["flexible_window_days"] is not None else None,
-                "category_id": int(r["category_id"]) if r["category_id"] is not None else None,
-                "type": r["type"],
-            }
-        )
+    if summary_only:
+        def _totals(conn):
+            return conn.execute(_SQL_COMMITMENT_TOTALS).fetchone()
+
+        row = await db_pool.run(_default_db_path(), _totals)
+        return {
+            "count": row["n"],
+            "total_cents": row["total_cents"],
+            "monthly_equivalent_cents": row["meq"],
+        }
+
+    def _query(conn):
+        return conn.execute(_SQL_LIST_COMMITMENTS).fetchall()
+
+    rows = await db_pool.run(_default_db_path(), _query)
+
+    items = [
+        {
+            "id": r["id"],
+            "name": r["name"],
+            "amount_cents": r["amount_cents"],
+            "due_rule": r["due_rule"],
+            "monthly_equivalent_cents": r["meq"],
+            "next_due_date": r["next_due_date"],
+            "priority": r["priority"],
+            "account_id": r["account_id"],
+            "flexible_window_days": r["flexible_window_days"],
+            "category_id": r["category_id"],
+            "type": r["type"],
+        }
+        for r in rows
+    ]
+    total_cents = sum(r["amount_cents"] for r in rows)
+    total_monthly_equiv = sum(r["meq"] for r in rows)
 
     return {
         "count": len(items),
@@ -103,49 +220,26 @@ async def create_commitment(request: Request):
     require_auth(request)
     require_csrf(request)
     rate_limit(request, scope="commitments-write")
-    try:
-        payload = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
-
-    name = (payload.get("name") or "").strip()
-    if not name:
-        raise HTTPException(status_code=400, detail="'name' is required")
-    amt_c = payload.get("amount_cents")
-    amt_e = payload.get("amount_eur")
-    if amt_c is None and amt_e is None:
-        raise HTTPException(status_code=400, detail="Provide amount_cents or amount_eur")
-    try:
-        amount_cents = int(amt_c) if amt_c is not None else int(round(float(amt_e) * 100.0))
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid amount")
-
-    due_rule = (payload.get("due_rule") or "MONTHLY").strip().upper()
-    next_due_date = (payload.get("next_due_date") or None)
-    acct_id = payload.get("account_id")
-    try:
-        account_id = int(acct_id) if acct_id is not None else None
-    except Exception:
-        raise HTTPException(status_code=400, detail="'account_id' must be an integer")
-    priority = payload.get("priority")
-    priority_i = int(priority) if priority is not None else 1
-    flex = payload.get("flexible_window_days")
-    flex_i = int(flex) if flex is not None else 0
-    cat = payload.get("category_id")
-    category_id = int(cat) if cat is not None else None
-    type_ = (payload.get("type") or "bill").strip()
-
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
-        # Validate account
-        if account_id is not None:
-            row = conn.execute("SELECT 1 FROM accounts WHERE id = ?", (account_id,)).fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Account not found")
-        cur = conn.execute(
-            """
+    body = await parse_json_body(request, CommitmentCreate)
+
+    name = body.name
+    amount_cents = body.amount_cents_value()
+    due_rule = (body.due_rule or "MONTHLY").strip().upper()
+    next_due_date = body.next_due_date or None
+    account_id = body.account_id
+    priority_i = body.priority if body.priority is not None else 1
+    flex_i = body.flexible_window_days if body.flexible_window_days is not None else 0
+    category_id = body.category_id
+    type_ = (body.type or "bill").strip()
+
+    def _write(conn):
+        # Account check rides along with the insert: no row is written or returned if it is missing
+        return conn.execute(
+            f"""
             INSERT INTO commitments(name, amount_cents, due_rule, next_due_date, priority, account_id, flexible_window_days, category_id, type)
-            VALUES (?,?,?,?,?,?,?,?,?)
+            SELECT ?,?,?,?,?,?,?,?,?
+            WHERE ? IS NULL OR EXISTS (SELECT 1 FROM accounts WHERE id = ?)
+            RETURNING {_RETURNING_COLUMNS}
             """,
             (
                 name,
@@ -157,28 +251,17 @@ async def create_commitment(request: Request):
                 flex_i,
                 category_id,
                 type_,
+                account_id,
+                account_id,
             ),
-        )
-        new_id = int(cur.lastrowid)
-        row = conn.execute(
-            "SELECT id, name, amount_cents, due_rule, next_due_date, priority, account_id, flexible_window_days, category_id, type FROM commitments WHERE id = ?",
-            (new_id,),
         ).fetchone()
+
+    row = await db_pool.run(_default_db_path(), _write, write=True)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Account not found")
     return {
         "status": "ok",
-        "commitment": {
-            "id": int(row["id"]),
-            "name": row["name"],
-            "amount_cents": int(row["amount_cents"]),
-            "due_rule": row["due_rule"],
-            "next_due_date": row["next_due_date"],
-            "priority": int(row["priority"]) if row["priority"] is not None else None,
-            "account_id": int(row["account_id"]) if row["account_id"] is not None else None,
-            "flexible_window_days": int(row["flexible_window_days"]) if row["flexible_window_days"] is not None else None,
-            "category_id": int(row["category_id"]) if row["category_id"] is not None else None,
-            "type": row["type"],
-            "monthly_equivalent_cents": _monthly_equivalent_cents(int(row["amount_cents"]), row["due_rule"]),
-        },
+        "commitment": _commitment_item(row),
     }
 
 
@@ -188,112 +271,65 @@ async def update_commitment(commitment_id: int, request: Request):
     require_auth(request)
     require_csrf(request)
     rate_limit(request, scope="commitments-write")
-    try:
-        payload = await request.json()
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid JSON body")
-
-    fields: list[str] = []
-    params: list = []
+    body = await parse_json_body(request, CommitmentFields)
+    sent = body.model_fields_set
 
-    def set_field(col: str, val):
-        fields.append(f"{col} = ?")
-        params.append(val)
+    updates: dict[str, Any] = {}
 
-    if "name" in payload and payload.get("name") is not None:
-        name = str(payload.get("name")).strip()
+    if body.name is not None:
+        name = body.name.strip()
         if not name:
             raise HTTPException(status_code=400, detail="'name' cannot be empty")
-        set_field("name", name)
-
-    if payload.get("amount_cents") is not None or payload.get("amount_eur") is not None:
-        try:
-            amt_c = payload.get("amount_cents")
-            amt_e = payload.get("amount_eur")
-            amount_cents = int(amt_c) if amt_c is not None else int(round(float(amt_e) * 100.0))
-        except Exception:
-            raise HTTPException(status_code=400, detail="Invalid amount")
-        set_field("amount_cents", amount_cents)
-
-    if "due_rule" in payload and payload.get("due_rule") is not None:
-        set_field("due_rule", str(payload.get("due_rule")).strip().upper())
-
-    if "next_due_date" in payload:
-        nd = payload.get("next_due_date")
+        updates["name"] = name
+
+    amount_cents = body.amount_cents_value()
+    if amount_cents is not None:
+        updates["amount_cents"] = amount_cents
+
+    if body.due_rule is not None:
+        updates["due_rule"] = body.due_rule.strip().upper()
+
+    if "next_due_date" in sent:
         # allow None to clear
-        set_field("next_due_date", nd)
-
-    if "priority" in payload and payload.get("priority") is not None:
-        try:
-            set_field("priority", int(payload.get("priority")))
-        except Exception:
-            raise HTTPException(status_code=400, detail="'priority' must be integer")
-
-    if "account_id" in payload:
-        acct = payload.get("account_id")
-        if acct is not None:
-            try:
-                account_id = int(acct)
-            except Exception:
-                raise HTTPException(status_code=400, detail="'account_id' must be integer")
-            # Validate account exists
-            dbp = _default_db_path()
-            with _connect(dbp) as conn:
-                row = conn.execute("SELECT 1 FROM accounts WHERE id = ?", (account_id,)).fetchone()
-                if not row:
-                    raise HTTPException(status_code=404, detail="Account not found")
-        else:
-            account_id = None
-        set_field("account_id", account_id)
-
-    if "flexible_window_days" in payload and payload.get("flexible_window_days") is not None:
-        try:
-            set_field("flexible_window_days", int(payload.get("flexible_window_days")))
-        except Exception:
-            raise HTTPException(status_code=400, detail="'flexible_window_days' must be integer")
-
-    if "category_id" in payload:
-        cat = payload.get("category_id")
-        try:
-            cid = int(cat) if cat is not None else None
-        except Exception:
-            raise HTTPException(status_code=400, detail="'category_id' must be integer")
-        set_field("category_id", cid)
-
-    if "type" in payload and payload.get("type") is not None:
-        set_field("type", str(payload.get("type")))
-
-    if not fields:
-        raise HTTPException(status_code=400, detail="No fields to update")
+        updates["next_due_date"] = body.next_due_date
+
+    if body.priority is not None:
+        updates["priority"] = body.priority
+
+    if "account_id" in sent:
+        updates["account_id"] = body.account_id
+
+    if body.flexible_window_days is not None:
+        updates["flexible_window_days"] = body.flexible_window_days
+
+    if "category_id" in sent:
+        updates["category_id"] = body.category_id
 
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
-        # Ensure exists
-        row = conn.execute("SELECT 1 FROM commitments WHERE id = ?", (commitment_id,)).fetchone()
-        if not row:
+    if body.type is not None:
+        updates["type"] = body.type
+
+    if not updates:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    account_id = updates.get("account_id")
+    check_account = account_id is not None
+    sql = _update_sql(tuple(updates), check_account)
+    params = [*updates.values(), commitment_id]
+    if check_account:
+        params.append(account_id)
+
+    def _write(conn):
+        row = conn.execute(sql, params).fetchone()
+        if row is None:
+            # Nothing updated: tell a missing commitment apart from a missing account
+            if check_account and conn.execute("SELECT 1 FROM commitments WHERE id = ?", (commitment_id,)).fetchone():
+                raise HTTPException(status_code=404, detail="Account not found")
             raise HTTPException(status_code=404, detail="Commitment not found")
-        params.append(commitment_id)
-        conn.execute(f"UPDATE commitments SET {', '.join(fields)} WHERE id = ?", params)
-        conn.commit()
-        row = conn.execute(
-            "SELECT id, name, amount_cents, due_rule, next_due_date, priority, account_id, flexible_window_days, category_id, type FROM commitments WHERE id = ?",
-            (commitment_id,),
-        ).fetchone()
+        return row
+
+    row = await db_pool.run(_default_db_path(), _write, write=True)
     return {
         "status": "ok",
-        "commitment": {
-            "id": int(row["id"]),
-            "name": row["name"],
-            "amount_cents": int(row["amount_cents"]),
-            "due_rule": row["due_rule"],
-            "next_due_date": row["next_due_date"],
-            "priority": int(row["priority"]) if row["priority"] is not None else None,
-            "account_id": int(row["account_id"]) if row["account_id"] is not None else None,
-            "flexible_window_days": int(row["flexible_window_days"]) if row["flexible_window_days"] is not None else None,
-            "category_id": int(row["category_id"]) if row["category_id"] is not None else None,
-            "type": row["type"],
-            "monthly_equivalent_cents": _monthly_equivalent_cents(int(row["amount_cents"]), row["due_rule"]),
-        },
+        "commitment": _commitment_item(row),
     }
 
 
@@ -302,10 +338,10 @@ async def delete_commitment(commitment_id: int, request: Request):
     require_auth(request)
     require_csrf(request)
     rate_limit(request, scope="commitments-write")
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
+    def _write(conn):
         cur = conn.execute("DELETE FROM commitments WHERE id = ?", (commitment_id,))
         if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Commitment not found")
-        conn.commit()
+
+    await db_pool.run(_default_db_path(), _write, write=True)
     return {"status": "deleted", "id": int(commitment_id)}
@@ -1,16 +1,32 @@
 from __future__ import annotations
 
 from dataclasses import asdict
+from functools import lru_cache
+from itertools import accumulate
 from datetime import date, datetime, timedelta
 from pathlib import Path
+from statistics import NormalDist
 from typing import Optional, List, Iterable
 
+import re
 import sqlite3
-from fastapi import APIRouter, HTTPException, Query, Request
+import threading
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi import Body
+import hashlib
 import json
 
-from forecast.calendar import Entry, compute_balances, expand_calendar, _default_db_path
+from forecast.calendar import (
+    Entry,
+    compute_balances,
+    expand_calendar,
+    min_balance,
+    parse_account_ids,
+    _default_db_path,
+    _IN_JSON_IDS,
+    _json_id_list,
+)
 from forecast.blended_stats import compute_daily_stats, compute_weekday_multipliers
 from config import (
     MONTE_CARLO_ENABLED,
@@ -21,15 +37,27 @@ from config import (
 from config import SALARY_DOM, SALARY_MIN_CENTS
 import random
 from security.deps import require_auth
+from db import pool as db_pool
+from db.pool import db_state_stamp
+from api.responses import ORJSONResponse, ndjson_line
+
+
+# Handlers that return plain dicts are still rendered by orjson; handlers with
+# date-keyed payloads return ORJSONResponse themselves to skip jsonable_encoder
+router = APIRouter(default_response_class=ORJSONResponse)
+
 
+_ONE_DAY = timedelta(days=1)
 
-router = APIRouter()
 
+def _posted_before(d: date) -> str:
+    """Exclusive upper bound on posted_at for "on or before `d`".
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    posted_at is ISO text starting with the UTC date ('YYYY-MM-DD' or
+    'YYYY-MM-DDTHH:MM:SSZ'), so string order matches date order and comparing
+    the raw column avoids calling DATE() on every row.
+    """
+    return (d + _ONE_DAY).isoformat()
 
 
 def _sum_cleared_between(conn: sqlite3.Connection, account_id: int, start_d: Optional[date], end_d: Optional[date]) -> int:
@@ -37,7 +65,7 @@ def _sum_cleared_between(conn: sqlite3.Connection, account_id: int, start_d: Opt
 
     - If start_d is None: sum up to end_d.
     - If end_d is None: sum from start_d onward.
-    - Otherwise: sum where DATE(posted_at) >= start_d and <= end_d.
+    - Otherwise: sum where posted_at falls on a day from start_d to end_d.
     """
     base = [
         "SELECT COALESCE(SUM(t.amount_cents), 0) AS s",
@@ -45,12 +73,13 @@ def _sum_cleared_between(conn: sqlite3.Connection, account_id: int, start_d: Opt
         "WHERE a.is_active = 1 AND t.is_cleared = 1 AND a.id = ?",
     ]
     params: list = [int(account_id)]
+    # Raw posted_at bounds (see _posted_before) keep the posted_at index usable
     if start_d is not None:
-        base.append("AND DATE(t.posted_at) >= ?")
+        base.append("AND t.posted_at >= ?")
         params.append(start_d.isoformat())
     if end_d is not None:
-        base.append("AND DATE(t.posted_at) <= ?")
-        params.append(end_d.isoformat())
+        base.append("AND t.posted_at < ?")
+        params.append(_posted_before(end_d))
     sql = "\n".join(base)
     row = conn.execute(sql, params).fetchone()
     return int(row["s"] if row and row["s"] is not None else 0)
@@ -71,48 +100,31 @@ def _load_anchor(conn: sqlite3.Connection, account_id: int) -> Optional[dict]:
     }
 
 
-def _tz_name() -> str:
-    import os
-
-    return os.getenv("SCHED_TZ") or os.getenv("TZ") or "UTC"
+def _ledger_daily_deltas(
+    conn: sqlite3.Connection, start: date, end: date, accounts: Optional[set[int]] = None
+) -> dict[str, int]:
+    """Return mapping of ISO date -> sum(amount_cents) for cleared transactions on that date.
 
-
-def _today_tz() -> date:
-    try:
-        from zoneinfo import ZoneInfo  # type: ignore
-
-        tz = ZoneInfo(_tz_name())
-        return datetime.now(tz).date()
-    except Exception:
-        return datetime.utcnow().date()
-
-
-def _ledger_daily_deltas(conn: sqlite3.Connection, start: date, end: date) -> dict[date, int]:
-    """Return mapping of date -> sum(amount_cents) for cleared transactions on that date.
-
-    Joins accounts to ensure only active accounts are considered.
+    Joins accounts to ensure only active accounts are considered; `accounts`
+    further restricts to those ids. posted_at bounds are raw ISO comparisons
+    (see _posted_before) so the posted_at index serves the range.
     """
-    rows = conn.execute(
-        """
-        SELECT DATE(t.posted_at) AS d, COALESCE(SUM(t.amount_cents), 0) AS delta
-        FROM transactions t
-        JOIN accounts a ON a.id = t.account_id
-        WHERE a.is_active = 1
-          AND t.is_cleared = 1
-          AND DATE(t.posted_at) >= ? AND DATE(t.posted_at) <= ?
-        GROUP BY DATE(t.posted_at)
-        ORDER BY DATE(t.posted_at)
-        """,
-        (start.isoformat(), end.isoformat()),
-    ).fetchall()
-    out: dict[date, int] = {}
-    for r in rows:
-        try:
-            d = date.fromisoformat(str(r[0]))
-            out[d] = int(r[1] or 0)
-        except Exception:
-            continue
-    return out
+    sql = [
+        "SELECT substr(t.posted_at, 1, 10) AS d, COALESCE(SUM(t.amount_cents), 0) AS delta",
+        "FROM transactions t",
+        "JOIN accounts a ON a.id = t.account_id",
+        "WHERE a.is_active = 1",
+        "  AND t.is_cleared = 1",
+        "  AND t.posted_at >= ? AND t.posted_at < ?",
+    ]
+    params: list = [start.isoformat(), _posted_before(end)]
+    if accounts:
+        sql.append(f"  AND a.id IN {_IN_JSON_IDS}")
+        params.append(_json_id_list(accounts))
+    sql.append("GROUP BY d")
+    sql.append("ORDER BY d")
+    # Keys stay as the YYYY-MM-DD text SQLite returns; callers key their output by ISO date too
+    return {r[0]: int(r[1] or 0) for r in conn.execute("\n".join(sql), params)}
 
 
 @router.get("/api/forecast/history")
@@ -136,44 +148,20 @@ def get_forecast_history(
 
     dbp = _default_db_path()
     opening_as_of = start_d - timedelta(days=1)
-    acc_set = _parse_accounts_param(accounts)
-    opening = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=acc_set)
-
-    with _connect(dbp) as conn:
-        deltas = _ledger_daily_deltas(conn, start_d, end_d) if not accounts else _ledger_daily_deltas(conn, start_d, end_d)
-        acc_set = _parse_accounts_param(accounts)
-        if acc_set:
-            # Re-run with filtering
-            qmarks = ",".join(["?"] * len(acc_set))
-            rows = conn.execute(
-                f"""
-                SELECT DATE(t.posted_at) AS d, COALESCE(SUM(t.amount_cents), 0) AS delta
-                FROM transactions t
-                JOIN accounts a ON a.id = t.account_id
-                WHERE a.is_active = 1 AND t.is_cleared = 1
-                  AND a.id IN ({qmarks})
-                  AND DATE(t.posted_at) >= ? AND DATE(t.posted_at) <= ?
-                GROUP BY DATE(t.posted_at)
-                ORDER BY DATE(t.posted_at)
-                """,
-                (*[int(x) for x in sorted(acc_set)], start_d.isoformat(), end_d.isoformat()),
-            ).fetchall()
-            deltas = {}
-            for r in rows:
-                try:
-                    d0 = date.fromisoformat(str(r[0]))
-                    deltas[d0] = int(r[1] or 0)
-                except Exception:
-                    continue
-
-    # Walk days and build balances
-    balances: dict[date, int] = {}
-    running = opening
-    d = start_d
-    while d <= end_d:
-        running = running + (deltas.get(d, 0))
-        balances[d] = running
-        d = d + timedelta(days=1)
+    acc_set = parse_account_ids(accounts)
+
+    with db_pool.connect(dbp) as conn:
+        opening = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=acc_set, conn=conn)
+        deltas = _ledger_daily_deltas(conn, start_d, end_d, acc_set)
+
+    # Running balance per day: fill a dense per-day delta list, then prefix-sum it in C
+    n_days = (end_d - start_d).days + 1
+    first_ordinal = start_d.toordinal()
+    from_ordinal = date.fromordinal
+    keys = [from_ordinal(first_ordinal + i).isoformat() for i in range(n_days)]
+    running_totals = accumulate([deltas.get(k, 0) for k in keys], initial=opening)
+    next(running_totals)  # skip the opening value itself
+    balances: dict[str, int] = dict(zip(keys, running_totals))
 
     # Heuristic salary checkpoints (optional): near configured day-of-month with inflow over threshold
     checkpoints: list[dict] = []
@@ -186,32 +174,23 @@ def get_forecast_history(
             d = min(dom, last)
             return date(y, m, d)
 
-        # Build windows per month and match deltas
-        d = start_d
-        seen_dates: set[date] = set()
-        while d <= end_d:
-            tgt = target_for_month(d.year, d.month)
-            win_start = tgt - timedelta(days=3)
-            win_end = tgt + timedelta(days=3)
-            # Iterate days in window within overall range
-            cursor = max(win_start, start_d)
-            while cursor <= min(win_end, end_d):
-                if cursor in deltas and deltas[cursor] >= int(SALARY_MIN_CENTS) and cursor not in seen_dates:
-                    checkpoints.append({
-                        "date": cursor.isoformat(),
-                        "amount_cents": int(deltas[cursor]),
-                    })
-                    seen_dates.add(cursor)
-                cursor = cursor + timedelta(days=1)
-            # Jump to first day of next month
-            if d.month == 12:
-                d = date(d.year + 1, 1, 1)
-            else:
-                d = date(d.year, d.month + 1, 1)
+        # One +/-3 day window around each month's target; targets are at least 28 days
+        # apart, so windows never overlap and each date is checked once
+        min_cents = int(SALARY_MIN_CENTS)
+        y, m = start_d.year, start_d.month
+        while (y, m) <= (end_d.year, end_d.month):
+            tgt = target_for_month(y, m)
+            for offset in range(-3, 4):
+                c = tgt + timedelta(days=offset)
+                if start_d <= c <= end_d:
+                    amount = deltas.get(c.isoformat())
+                    if amount is not None and amount >= min_cents:
+                        checkpoints.append({"date": c.isoformat(), "amount_cents": int(amount)})
+            y, m = (y + 1, 1) if m == 12 else (y, m + 1)
 
     return {
         "opening_balance_cents": opening,
-        "balances": {d.isoformat(): v for d, v in balances.items()},
+        "balances": balances,
         "meta": {
             "source": "ledger",
             "db_path": str(dbp),
@@ -221,101 +200,137 @@ def get_forecast_history(
     }
 
 
-def _load_key_event_lead_times(conn: sqlite3.Connection) -> dict[int, Optional[int]]:
-    lead: dict[int, Optional[int]] = {}
-    for row in conn.execute("SELECT id, lead_time_days FROM key_spend_events"):
-        lead[int(row["id"])] = int(row["lead_time_days"]) if row["lead_time_days"] is not None else None
-    return lead
+_BIRTHDAY_RE = re.compile(r"birthday|bday", re.IGNORECASE)
+_HOLIDAY_RE = re.compile(r"christmas|xmas|holiday", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _key_event_marker(name: str) -> str:
+    # Birthday wins over holiday when a name mentions both
+    if _BIRTHDAY_RE.search(name):
+        return "🎂"
+    if _HOLIDAY_RE.search(name):
+        return "🎄"
+    return "🎯"
 
 
 def _ui_marker(entry: Entry) -> Optional[str]:
     if entry.type == "commitment":
         return "📄"
     if entry.type == "key_event":
-        n = entry.name.lower()
-        if "birthday" in n or "bday" in n:
-            return "🎂"
-        if "christmas" in n or "xmas" in n or "holiday" in n:
-            return "🎄"
-        return "🎯"
+        # Recurring events repeat the same name across the horizon
+        return _key_event_marker(entry.name)
     return None
 
 
+_SQL_SNAPSHOT_TOTAL = (
+    "SELECT COALESCE(SUM(s.cleared_cents), 0) AS bal "
+    "FROM account_balance_snapshots s JOIN accounts a ON a.id = s.account_id "
+    "WHERE a.is_active = 1"
+)
+_SQL_SNAPSHOT_OPENING_BALANCE = (
+    "SELECT (SELECT COALESCE(SUM(s.cleared_cents), 0) "
+    "        FROM account_balance_snapshots s JOIN accounts a ON a.id = s.account_id "
+    "        WHERE a.is_active = 1 AND s.month < ?)"
+    "     + (SELECT COALESCE(SUM(t.amount_cents), 0) "
+    "        FROM transactions t JOIN accounts a ON a.id = t.account_id "
+    "        WHERE a.is_active = 1 AND t.is_cleared = 1 AND t.posted_at >= ? AND t.posted_at < ?) AS bal"
+)
+
+
+@lru_cache(maxsize=8)
+def _has_balance_snapshots(db_path_str: str) -> bool:
+    """True when migration 0007 (trigger-maintained monthly cleared totals) is applied.
+
+    Cached per DB; startup runs migrations before the first request.
+    """
+    with db_pool.connect(Path(db_path_str)) as conn:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'account_balance_snapshots'"
+        ).fetchone()
+    return row is not None
+
+
 def compute_opening_balance_cents(
     as_of: Optional[date] = None,
     *,
     db_path: Optional[Path] = None,
     accounts: Optional[set[int]] = None,
+    conn: Optional[sqlite3.Connection] = None,
 ) -> int:
     """Compute opening balance as sum of cleared transactions across active accounts.
 
     If `as_of` is provided, only include transactions with posted_at on or before that date.
-    posted_at is stored as ISO text; we compare on the DATE(posted_at) in SQLite for safety.
+    When account_balance_snapshots exists, whole months come from the snapshot rows and
+    only as_of's own month is summed from transactions.
+    `db_path` (default: the configured DB) names the DB; pass `conn` to reuse a caller's open
+    connection to it, otherwise one is borrowed from the pool.
     """
     dbp = db_path or _default_db_path()
-    with _connect(dbp) as conn:
-        # If specific accounts requested, honor per-account anchors and sum results
-        if accounts:
-            total = 0
-            for acc in sorted(accounts):
-                anchor = _load_anchor(conn, int(acc))
-                if anchor is None:
-                    # Fallback: sum cleared up to as_of for this account
-                    total += _sum_cleared_between(conn, int(acc), None, as_of)
-                else:
-                    ad = anchor["anchor_date"]
-                    bal0 = anchor["anchor_balance_cents"]
-                    if as_of is None or as_of == ad:
-                        total += bal0
-                    elif as_of > ad:
-                        delta = _sum_cleared_between(conn, int(acc), ad + timedelta(days=0), as_of)
-                        # We used >= anchor_date; avoid double-counting on same day by starting after anchor?
-                        # Using strictly greater: start at ad + 1 day
-                        delta = _sum_cleared_between(conn, int(acc), ad + timedelta(days=1), as_of)
-                        total += bal0 + delta
-                    else:  # as_of < anchor_date, walk backward
-                        delta = _sum_cleared_between(conn, int(acc), as_of + timedelta(days=1), ad)
-                        total += bal0 - delta
-            return int(total)
-
-        # Aggregate path (no account filter): fall back to original cleared-sum
-        base = [
-            "SELECT COALESCE(SUM(t.amount_cents), 0) AS bal",
-            "FROM transactions t",
-            "JOIN accounts a ON a.id = t.account_id",
-            "WHERE a.is_active = 1 AND t.is_cleared = 1",
-        ]
-        params: list = []
-        if as_of is not None:
-            base.append("AND DATE(t.posted_at) <= ?")
-            params.append(as_of.isoformat())
-        sql = "\n".join(base)
-        cur = conn.execute(sql, params)
-        row = cur.fetchone()
+    if conn is None:
+        with db_pool.connect(dbp) as own_conn:
+            return compute_opening_balance_cents(as_of, db_path=dbp, accounts=accounts, conn=own_conn)
+
+    # If specific accounts requested, honor per-account anchors and sum results
+    if accounts:
+        total = 0
+        for acc in accounts:
+            anchor = _load_anchor(conn, int(acc))
+            if anchor is None:
+                # Fallback: sum cleared up to as_of for this account
+                total += _sum_cleared_between(conn, int(acc), None, as_of)
+            else:
+                ad = anchor["anchor_date"]
+                bal0 = anchor["anchor_balance_cents"]
+                if as_of is None or as_of == ad:
+                    total += bal0
+                elif as_of > ad:
+                    # Start the day after the anchor so anchor-day rows are not double-counted
+                    delta = _sum_cleared_between(conn, int(acc), ad + timedelta(days=1), as_of)
+                    total += bal0 + delta
+                else:  # as_of < anchor_date, walk backward
+                    delta = _sum_cleared_between(conn, int(acc), as_of + timedelta(days=1), ad)
+                    total += bal0 - delta
+        return int(total)
+
+    # Aggregate path (no account filter): monthly snapshots for whole months before
+    # as_of, plus the cleared rows of as_of's own month
+    if _has_balance_snapshots(str(dbp)):
+        if as_of is None:
+            row = conn.execute(_SQL_SNAPSHOT_TOTAL).fetchone()
+        else:
+            month_start = as_of.replace(day=1).isoformat()
+            row = conn.execute(
+                _SQL_SNAPSHOT_OPENING_BALANCE,
+                (month_start[:7], month_start, _posted_before(as_of)),
+            ).fetchone()
         return int(row["bal"] if row and row["bal"] is not None else 0)
 
-
-def _parse_accounts_param(val: str | None) -> set[int] | None:
-    if not val:
-        return None
-    out: set[int] = set()
-    for part in val.split(","):
-        part = part.strip()
-        if not part:
-            continue
-        try:
-            out.add(int(part))
-        except Exception:
-            continue
-    return out or None
+    # Schemas without snapshots: sum every cleared row
+    base = [
+        "SELECT COALESCE(SUM(t.amount_cents), 0) AS bal",
+        "FROM transactions t",
+        "JOIN accounts a ON a.id = t.account_id",
+        "WHERE a.is_active = 1 AND t.is_cleared = 1",
+    ]
+    params: list = []
+    if as_of is not None:
+        base.append("AND t.posted_at < ?")
+        params.append(_posted_before(as_of))
+    sql = "\n".join(base)
+    cur = conn.execute(sql, params)
+    row = cur.fetchone()
+    return int(row["bal"] if row and row["bal"] is not None else 0)
 
 
-@router.get("/api/forecast/calendar")
+@router.get("/api/forecast/calendar", response_class=ORJSONResponse)
 def get_forecast_calendar(
+    request: Request,
     start: str = Query(..., description="Start date YYYY-MM-DD"),
     end: str = Query(..., description="End date YYYY-MM-DD"),
     buffer_floor: int = Query(0, description="Buffer floor in cents"),
     accounts: str | None = Query(None, description="Comma-separated account IDs to include"),
+    layout: str = Query("rows", description="'rows' (list of entry objects) or 'columns' (one list per field)"),
 ):
     # Validate dates
     try:
@@ -325,77 +340,84 @@ def get_forecast_calendar(
         raise HTTPException(status_code=400, detail="Invalid date format; use YYYY-MM-DD")
     if end_d < start_d:
         raise HTTPException(status_code=400, detail="end must be on or after start")
+    if layout not in ("rows", "columns"):
+        raise HTTPException(status_code=400, detail="layout must be 'rows' or 'columns'")
 
     # Opening balance as of the day before the start of horizon
     opening_as_of = start_d - timedelta(days=1)
     dbp = _default_db_path()
-    accounts_set = _parse_accounts_param(accounts)
+    accounts_set = parse_account_ids(accounts)
+
+    # Unchanged DB + same parameters: skip all SQL and serialization
+    etag = _etag(dbp, "calendar", start_d, end_d, buffer_floor, sorted(accounts_set or ()), layout)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
 
-    opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=accounts_set)
+    # One connection serves the opening balance and entry expansion (which carries key-event lead times)
+    with db_pool.connect(dbp) as conn:
+        opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=accounts_set, conn=conn)
+        entries = expand_calendar(start_d, end_d, accounts=accounts_set, conn=conn)
 
-    # Expand entries and compute balances
-    entries = expand_calendar(start_d, end_d, db_path=dbp, accounts=accounts_set)
     balances = compute_balances(opening_balance, entries)
 
     # Compute min balance and date deterministically
-    min_balance_cents = None
-    min_balance_date = None
-    if balances:
-        # Sort by date to ensure deterministic selection when multiple equal minima
-        items = sorted(balances.items(), key=lambda kv: kv[0])
-        min_balance_cents = items[0][1]
-        min_balance_date = items[0][0]
-        for d, bal in items:
-            if bal < min_balance_cents:
-                min_balance_cents = bal
-                min_balance_date = d
+    min_balance_cents, min_balance_date = min_balance(balances)
 
     # Enrich entries with UI marker and key-event lead-window flag.
     # For deterministic behavior in UI/tests, treat `today` as the start of the requested horizon.
     today = start_d
-    lead_map: dict[int, Optional[int]] = {}
-    with _connect(dbp) as conn:
-        try:
-            lead_map = _load_key_event_lead_times(conn)
-        except Exception:
-            lead_map = {}
 
-    enriched = []
-    for e in entries:
-        lead_days = lead_map.get(e.source_id) if e.type == "key_event" else None
-        is_within = None
-        if e.type == "key_event" and lead_days is not None:
-            days_until = (e.date - today).days
-            is_within = 0 <= days_until <= int(lead_days)
-        enriched.append(
+    markers = [_ui_marker(e) for e in entries]
+    within: list[Optional[bool]] = [
+        None if e.lead_time_days is None else 0 <= (e.date - today).days <= e.lead_time_days for e in entries
+    ]
+
+    enriched: list[dict] | dict[str, list]
+    if layout == "columns":
+        # One flat list per field: no per-entry dict for large horizons
+        enriched = {
+            "date": [e.date for e in entries],
+            "type": [e.type for e in entries],
+            "name": [e.name for e in entries],
+            "amount_cents": [e.amount_cents for e in entries],
+            "source_id": [e.source_id for e in entries],
+            "shift_applied": [e.shift_applied for e in entries],
+            "policy": [e.policy for e in entries],
+            "ui_marker": markers,
+            "is_within_lead_window": within,
+        }
+    else:
+        enriched = [
             {
-                "date": e.date.isoformat(),
+                "date": e.date,
                 "type": e.type,
                 "name": e.name,
                 "amount_cents": e.amount_cents,
                 "source_id": e.source_id,
                 "shift_applied": e.shift_applied,
                 "policy": e.policy,
-                "ui_marker": _ui_marker(e),
+                "ui_marker": marker,
                 "is_within_lead_window": is_within,
             }
-        )
+            for e, marker, is_within in zip(entries, markers, within)
+        ]
 
     resp = {
         "opening_balance_cents": opening_balance,
         "entries": enriched,
-        "balances": {d.isoformat(): bal for d, bal in balances.items()},
+        # Date keys/values are formatted by the response renderer in one pass
+        "balances": balances,
         "min_balance_cents": min_balance_cents,
-        "min_balance_date": min_balance_date.isoformat() if min_balance_date else None,
+        "min_balance_date": min_balance_date,
         "meta": {
             "opening_balance_strategy": "sum_cleared_active_accounts_as_of(start_minus_one)",
             "buffer_floor": buffer_floor,
             "below_buffer": (min_balance_cents is not None and buffer_floor is not None and min_balance_cents < buffer_floor),
             "db_path": str(dbp),
-            "today": today.isoformat(),
+            "today": today,
         },
     }
-    return resp
+    return ORJSONResponse(resp, headers={"ETag": etag, "Cache-Control": _FORECAST_CACHE_CONTROL})
 
 
 @router.get("/api/forecast/calendar/debug")
@@ -409,7 +431,8 @@ def get_forecast_calendar_debug(
 
     Returns opening balance as of start-1, all expanded entries, and a per-day
     breakdown with opening→delta→closing and the items contributing to delta.
-    Protected by admin token when configured.
+    Each entry carries every Entry field, including `lead_time_days` (key events
+    only, null otherwise). Protected by admin token when configured.
     """
     # Auth (no-op if ADMIN_TOKEN not set)
     try:
@@ -428,10 +451,10 @@ def get_forecast_calendar_debug(
 
     dbp = _default_db_path()
     opening_as_of = start_d - timedelta(days=1)
-    opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=acc_set)
-
-    acc_set = _parse_accounts_param(accounts)
-    entries = expand_calendar(start_d, end_d, db_path=dbp, accounts=acc_set)
+    acc_set = parse_account_ids(accounts)
+    with db_pool.connect(dbp) as conn:
+        opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, accounts=acc_set, conn=conn)
+        entries = expand_calendar(start_d, end_d, accounts=acc_set, conn=conn)
     balances = compute_balances(opening_balance, entries)
 
     # Group entries by date
@@ -453,9 +476,10 @@ def get_forecast_calendar_debug(
     running = opening_balance
     d = start_d
     while d <= end_d:
+        # compute_balances already summed each entry day, so the delta is a subtraction
+        closing = balances.get(d, running)
+        delta = closing - running
         items = by_day.get(d, [])
-        delta = sum(int(it["amount_cents"]) for it in items) if items else 0
-        closing = balances.get(d, running + delta)
         rows.append(
             {
                 "date": d.isoformat(),
@@ -466,26 +490,18 @@ def get_forecast_calendar_debug(
             }
         )
         running = closing
-        d = d + timedelta(days=1)
+        d += _ONE_DAY
 
-    return {
-        "opening_balance_cents": opening_balance,
-        "balances": {d.isoformat(): b for d, b in balances.items()},
-        "rows": rows,
-        "entries": [
-            {
-                "date": e.date.isoformat(),
-                "type": e.type,
-                "name": e.name,
-                "amount_cents": e.amount_cents,
-                "source_id": e.source_id,
-                "shift_applied": e.shift_applied,
-                "policy": e.policy,
-            }
-            for e in entries
-        ],
-        "meta": {"db_path": str(dbp), "accounts": sorted(list(acc_set)) if acc_set else None},
-    }
+    # Entry is a dataclass: the renderer serializes entries and date keys directly
+    return ORJSONResponse(
+        {
+            "opening_balance_cents": opening_balance,
+            "balances": balances,
+            "rows": rows,
+            "entries": entries,
+            "meta": {"db_path": str(dbp), "accounts": sorted(list(acc_set)) if acc_set else None},
+        }
+    )
 
 
 @router.get("/api/transactions/export")
@@ -497,13 +513,17 @@ def export_transactions(
     include_uncleared: bool = Query(False, description="Include uncleared transactions"),
     limit: int = Query(5000, ge=1, le=100000),
     offset: int = Query(0, ge=0),
+    fmt: str = Query("json", alias="format", description="'json' (single document) or 'ndjson' (streamed, one row per line)"),
 ):
     """Export transactions in a date window for diagnostics.
 
     Protected by admin token when configured. Returns JSON rows with account and
-    category names when available.
+    category names when available. With format=ndjson the rows are streamed
+    straight from the cursor, so memory stays flat for large limits.
     """
     require_auth(request)
+    if fmt not in ("json", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be 'json' or 'ndjson'")
     try:
         start_d = date.fromisoformat(start)
         end_d = date.fromisoformat(end)
@@ -512,82 +532,158 @@ def export_transactions(
     if end_d < start_d:
         raise HTTPException(status_code=400, detail="end must be on or after start")
 
-    acc_set = _parse_accounts_param(accounts)
+    acc_set = parse_account_ids(accounts)
     q = [
         "SELECT t.posted_at, t.amount_cents, t.payee, t.memo, t.account_id, a.name AS account_name,",
         "       t.category_id, c.name AS category_name, t.is_cleared, t.source, t.external_id",
         "FROM transactions t",
         "LEFT JOIN accounts a ON a.id = t.account_id",
         "LEFT JOIN categories c ON c.id = t.category_id",
-        "WHERE DATE(t.posted_at) >= ? AND DATE(t.posted_at) <= ?",
+        "WHERE t.posted_at >= ? AND t.posted_at < ?",
     ]
-    params: list = [start_d.isoformat(), end_d.isoformat()]
+    params: list = [start_d.isoformat(), _posted_before(end_d)]
     if not include_uncleared:
         q.append("AND t.is_cleared = 1")
     if acc_set:
-        q.append(f"AND t.account_id IN ({','.join(['?']*len(acc_set))})")
-        params.extend(int(x) for x in sorted(acc_set))
-    q.append("ORDER BY DATE(t.posted_at) ASC, t.idempotency_key ASC")
+        q.append(f"AND t.account_id IN {_IN_JSON_IDS}")
+        params.append(_json_id_list(acc_set))
+    q.append("ORDER BY substr(t.posted_at, 1, 10) ASC, t.idempotency_key ASC")
     q.append("LIMIT ? OFFSET ?")
     params.extend([int(limit), int(offset)])
 
+    sql = "\n".join(q)
     dbp = _default_db_path()
-    rows_out: list[dict] = []
-    with _connect(dbp) as conn:
-        cur = conn.execute("\n".join(q), params)
-        for r in cur:
-            rows_out.append(
-                {
-                    "posted_at": r["posted_at"],
-                    "amount_cents": int(r["amount_cents"]),
-                    "payee": r["payee"],
-                    "memo": r["memo"],
-                    "account_id": int(r["account_id"]) if r["account_id"] is not None else None,
-                    "account_name": r["account_name"],
-                    "category_id": int(r["category_id"]) if r["category_id"] is not None else None,
-                    "category_name": r["category_name"],
-                    "is_cleared": bool(r["is_cleared"]),
-                    "source": r["source"],
-                    "external_id": r["external_id"],
-                }
-            )
-
-    return {"transactions": rows_out, "count": len(rows_out), "db_path": str(dbp)}
-
-
-def _load_transactions_for_stats(db_path: Path, window_days: int = 180) -> list[dict]:
-    """Load recent transactions joined with category names for heuristic filtering.
-
-    Returns a list of dicts suitable for blended_stats helpers.
+
+    if fmt == "ndjson":
+        def _stream() -> Iterable[bytes]:
+            # The pooled connection is held only while the client is reading
+            with db_pool.connect(dbp) as conn:
+                for r in conn.execute(sql, params):
+                    yield ndjson_line(_export_row(r))
+
+        return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+    with db_pool.connect(dbp) as conn:
+        rows_out = [_export_row(r) for r in conn.execute(sql, params)]
+
+    return ORJSONResponse({"transactions": rows_out, "count": len(rows_out), "db_path": str(dbp)})
+
+
+def _export_row(r: sqlite3.Row) -> dict:
+    return {
+        "posted_at": r["posted_at"],
+        "amount_cents": int(r["amount_cents"]),
+        "payee": r["payee"],
+        "memo": r["memo"],
+        "account_id": int(r["account_id"]) if r["account_id"] is not None else None,
+        "account_name": r["account_name"],
+        "category_id": int(r["category_id"]) if r["category_id"] is not None else None,
+        "category_name": r["category_name"],
+        "is_cleared": bool(r["is_cleared"]),
+        "source": r["source"],
+        "external_id": r["external_id"],
+    }
+
+
+# Same exclusions as blended_stats._should_exclude for the fields we select:
+# outflows only, and no Transfer/Income/Savings hint in the category or its group.
+_SQL_DAILY_SPEND_FOR_STATS = """
+    SELECT substr(t.posted_at, 1, 10) AS day, SUM(t.amount_cents) AS amount_cents
+    FROM transactions t
+    LEFT JOIN categories c ON c.id = t.category_id
+    LEFT JOIN categories cg ON cg.id = c.parent_id
+    WHERE t.posted_at >= ?
+      AND t.amount_cents < 0
+      AND NOT (
+        COALESCE(c.name, '') LIKE '%transfer%' OR COALESCE(c.name, '') LIKE '%income%'
+        OR COALESCE(c.name, '') LIKE '%savings%'
+        OR COALESCE(cg.name, '') LIKE '%transfer%' OR COALESCE(cg.name, '') LIKE '%income%'
+        OR COALESCE(cg.name, '') LIKE '%savings%'
+      )
+    GROUP BY day
+"""
+
+
+def _load_daily_spend_for_stats(
+    db_path: Path, window_days: int = 180, *, conn: Optional[sqlite3.Connection] = None
+) -> list[dict]:
+    """Variable spend over the recent window, pre-aggregated to one row per day.
+
+    Filtering and per-day summing happen in SQL, so at most window_days + 1 rows
+    cross into Python. Each row is shaped like a transaction (posted_at,
+    amount_cents), so the blended_stats helpers produce the same series they
+    would from the raw ledger rows. Pass `conn` to reuse a caller's open connection.
     """
-    rows: list[dict] = []
-    with _connect(db_path) as conn:
-        # Limit to a reasonable window by posted_at
-        cur = conn.execute(
-            """
-            SELECT t.amount_cents,
-                   t.posted_at,
-                   t.category_id,
-                   c.name AS category_name,
-                   cg.name AS category_group
-            FROM transactions t
-            LEFT JOIN categories c ON c.id = t.category_id
-            LEFT JOIN categories cg ON cg.id = c.parent_id
-            WHERE DATE(t.posted_at) >= DATE('now', ?)
-            """,
-            (f"-{int(window_days)} days",),
-        )
-        for r in cur:
-            rows.append(
-                {
-                    "amount_cents": int(r["amount_cents"]) if r["amount_cents"] is not None else 0,
-                    "posted_at": r["posted_at"],
-                    "category_id": r["category_id"],
-                    "category_name": r["category_name"],
-                    "category_group": r["category_group"],
-                }
-            )
-    return rows
+    if conn is None:
+        with db_pool.connect(db_path) as own_conn:
+            return _load_daily_spend_for_stats(db_path, window_days, conn=own_conn)
+
+    cutoff = (datetime.utcnow().date() - timedelta(days=int(window_days))).isoformat()
+    cur = conn.cursor()
+    cur.row_factory = None
+    fetched = cur.execute(_SQL_DAILY_SPEND_FOR_STATS, (cutoff,)).fetchall()
+    return [{"posted_at": day, "amount_cents": int(amount)} for day, amount in fetched]
+
+
+# Chart views poll these endpoints; a short private max-age absorbs bursts
+_FORECAST_CACHE_CONTROL = "private, max-age=5"
+
+
+def _etag(db_path: Path, *params: object) -> str:
+    """Strong ETag over the DB state stamp and the request parameters."""
+    raw = repr((db_state_stamp(db_path), params)).encode()
+    return '"' + hashlib.blake2b(raw, digest_size=8).hexdigest() + '"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in header.split(","))
+
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _FORECAST_CACHE_CONTROL})
+
+
+_BLENDED_PARAMS_CACHE: dict[tuple, tuple[tuple[float, ...], int, int]] = {}
+_BLENDED_PARAMS_CACHE_SIZE = 8
+_BLENDED_PARAMS_LOCK = threading.Lock()
+
+
+def _blended_params(
+    db_path: Path, window_days: int = 180, *, conn: Optional[sqlite3.Connection] = None
+) -> tuple[list[float], int, int]:
+    """Weekday multipliers and daily mu/sigma from recent transactions, cached.
+
+    The cache key carries the DB state stamp plus today's date, since the
+    stats window slides daily. On a miss the window is read on `conn` when
+    given (the caller's open connection), else on a pooled one.
+    """
+    key = (str(db_path), int(window_days), datetime.utcnow().date().isoformat()) + db_state_stamp(db_path)
+    hit = _BLENDED_PARAMS_CACHE.get(key)
+    if hit is None:
+        daily = _load_daily_spend_for_stats(db_path, window_days=window_days, conn=conn)
+        mults = compute_weekday_multipliers(daily, window_days=window_days)
+        mu_c, sigma_c = compute_daily_stats(daily, window_days=window_days)
+        hit = (tuple(mults), mu_c, sigma_c)
+        with _BLENDED_PARAMS_LOCK:
+            while len(_BLENDED_PARAMS_CACHE) >= _BLENDED_PARAMS_CACHE_SIZE:
+                # Oldest entry first (dicts keep insertion order)
+                del _BLENDED_PARAMS_CACHE[next(iter(_BLENDED_PARAMS_CACHE))]
+            _BLENDED_PARAMS_CACHE[key] = hit
+    mults_t, mu_c, sigma_c = hit
+    return list(mults_t), mu_c, sigma_c
+
+
+def _expected_spend_by_weekday(mu_daily: float, mults: List[float]) -> list[int]:
+    """Rounded expected daily spend for Mon..Sun; blended loops index it by weekday."""
+    return [int(round(mu_daily * float(m))) for m in mults]
+
+
+# Standard normal P10/P90 quantiles for the closed-form Monte Carlo bands
+_Z10 = NormalDist().inv_cdf(0.10)
+_Z90 = NormalDist().inv_cdf(0.90)
 
 
 @router.get("/api/forecast/monte-carlo")
@@ -599,6 +695,7 @@ def get_forecast_monte_carlo(
     weekday_mult: Optional[str] = Query(None, description="JSON array of 7 floats for weekday multipliers, Mon..Sun"),
     iterations: Optional[int] = Query(None, description="Number of Monte Carlo iterations (<= max)"),
     seed: Optional[int] = Query(None, description="RNG seed for reproducibility"),
+    method: str = Query("sampled", description="sampled | analytic (closed-form normal quantiles; takes no iterations/seed)"),
 ):
     # Feature flag gate
     if not MONTE_CARLO_ENABLED:
@@ -612,17 +709,17 @@ def get_forecast_monte_carlo(
         raise HTTPException(status_code=400, detail="Invalid date format; use YYYY-MM-DD")
     if end_d < start_d:
         raise HTTPException(status_code=400, detail="end must be on or after start")
+    if method not in ("sampled", "analytic"):
+        raise HTTPException(status_code=400, detail="method must be 'sampled' or 'analytic'")
+    if method == "analytic" and (iterations is not None or seed is not None):
+        raise HTTPException(status_code=400, detail="iterations and seed only apply to method=sampled")
 
     dbp = _default_db_path()
 
     # Deterministic baseline calendar balances for the horizon
     opening_as_of = start_d - timedelta(days=1)
-    opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp)
-    entries = expand_calendar(start_d, end_d, db_path=dbp)
-    balances_cal = compute_balances(opening_balance, entries)
-
     # Parameters: parse or compute from stats
-    mults: List[float]
+    mults: List[float] | None = None
     if weekday_mult:
         try:
             arr = json.loads(weekday_mult)
@@ -631,17 +728,20 @@ def get_forecast_monte_carlo(
             mults = [float(x) for x in arr]
         except Exception:
             raise HTTPException(status_code=400, detail="weekday_mult must be a JSON array of 7 numbers")
-    else:
-        txns = _load_transactions_for_stats(dbp, window_days=180)
-        mults = compute_weekday_multipliers(txns, window_days=180)
 
-    if mu_daily is None or sigma_daily is None:
-        txns = _load_transactions_for_stats(dbp, window_days=180)
-        mu_c, sigma_c = compute_daily_stats(txns, window_days=180)
-        if mu_daily is None:
-            mu_daily = mu_c
-        if sigma_daily is None:
-            sigma_daily = sigma_c
+    # One connection serves the opening balance, expansion and (on a cache miss) the stats window
+    with db_pool.connect(dbp) as conn:
+        opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, conn=conn)
+        entries = expand_calendar(start_d, end_d, conn=conn)
+        if mults is None or mu_daily is None or sigma_daily is None:
+            stats_mults, mu_c, sigma_c = _blended_params(dbp, window_days=180, conn=conn)
+            if mults is None:
+                mults = stats_mults
+            if mu_daily is None:
+                mu_daily = mu_c
+            if sigma_daily is None:
+                sigma_daily = sigma_c
+    balances_cal = compute_balances(opening_balance, entries)
 
     # Iterations/seed
     iters = int(iterations or MONTE_CARLO_DEFAULT_ITER)
@@ -653,56 +753,68 @@ def get_forecast_monte_carlo(
     p10: dict[date, int] = {}
     p90: dict[date, int] = {}
 
-    # Precompute per-date mean (modulated by weekday multiplier)
-    items = sorted(balances_cal.items(), key=lambda kv: kv[0])
-    for d, bal in items:
-        w = d.weekday()  # 0=Mon..6=Sun
-        mean = float(mu_daily or 0) * float(mults[w])
-        sigma = float(sigma_daily or 0)
-        draws: list[float] = []
-        for _ in range(iters):
-            x = rng.gauss(mean, sigma)
-            # Clamp to >= 0 (no negative spend magnitude)
-            if x < 0:
-                x = 0.0
-            draws.append(x)
-        # Compute percentiles on draws
-        draws.sort()
-        def _pct(data: List[float], q: float) -> float:
-            if not data:
-                return 0.0
-            # Simple nearest-rank interpolation
-            idx = max(0, min(len(data) - 1, int(round(q * (len(data) - 1)))))
-            return data[idx]
-
-        d10 = _pct(draws, 0.10)
-        d90 = _pct(draws, 0.90)
-        # Bands are baseline minus spend
-        lower = int(round(bal - d90))
-        upper = int(round(bal - d10))
-        p10[d] = lower
-        p90[d] = upper
+    # Per-weekday mean (modulated by weekday multiplier)
+    means_by_wd = [float(mu_daily or 0) * float(m) for m in mults]
+    # A std dev has no sign; a negative sigma_daily would otherwise swap the bands
+    sigma = abs(float(sigma_daily or 0))
+
+    if method == "analytic":
+        # Daily spend is N(mean, sigma) clamped at 0; clamping is monotonic, so the clamped
+        # P10/P90 are just the normal quantiles clamped. Same bands the sampler converges to.
+        spend10_by_wd = [max(mean + _Z10 * sigma, 0.0) for mean in means_by_wd]
+        spend90_by_wd = [max(mean + _Z90 * sigma, 0.0) for mean in means_by_wd]
+        for d, bal in balances_cal.items():
+            wd = d.weekday()
+            p10[d] = int(round(bal - spend90_by_wd[wd]))
+            p90[d] = int(round(bal - spend10_by_wd[wd]))
+    else:
+        # Nearest-rank P10/P90 positions
+        i10 = max(0, min(iters - 1, int(round(0.10 * (iters - 1)))))
+        i90 = max(0, min(iters - 1, int(round(0.90 * (iters - 1)))))
+        gauss = rng.gauss
+        draw_range = range(iters)
+
+        # compute_balances yields dates in ascending order, which fixes the RNG draw order
+        for d, bal in balances_cal.items():
+            mean = means_by_wd[d.weekday()]  # 0=Mon..6=Sun
+            if sigma == 0.0:
+                # Every draw equals the mean; sigma is the same for all dates, so skipping the RNG is consistent
+                d10 = d90 = max(mean, 0.0)
+            else:
+                draws = [gauss(mean, sigma) for _ in draw_range]
+                draws.sort()
+                # Clamping to >= 0 (no negative spend magnitude) is monotonic, so it
+                # commutes with sorting and only the two picked draws need it
+                d10 = max(draws[i10], 0.0)
+                d90 = max(draws[i90], 0.0)
+            # Bands are baseline minus spend
+            p10[d] = int(round(bal - d90))
+            p90[d] = int(round(bal - d10))
 
     resp = {
-        "baseline_calendar": {d.isoformat(): v for d, v in balances_cal.items()},
+        # Date keys are formatted by the response renderer
+        "baseline_calendar": balances_cal,
         "bands": {
-            "p10": {d.isoformat(): v for d, v in p10.items()},
-            "p90": {d.isoformat(): v for d, v in p90.items()},
+            "p10": p10,
+            "p90": p90,
         },
         "params": {
             "mu_daily_cents": int(mu_daily or 0),
             "sigma_daily_cents": int(sigma_daily or 0),
             "weekday_mult": mults,
-            "iterations": iters,
-            "seed": int(seed if seed is not None else MONTE_CARLO_DEFAULT_SEED),
+            # The closed form draws nothing, so it reports no iterations/seed
+            "iterations": iters if method == "sampled" else None,
+            "seed": int(seed if seed is not None else MONTE_CARLO_DEFAULT_SEED) if method == "sampled" else None,
+            "method": method,
         },
-        "meta": {"horizon": {"start": start_d.isoformat(), "end": end_d.isoformat()}},
+        "meta": {"horizon": {"start": start_d, "end": end_d}},
     }
-    return resp
+    return ORJSONResponse(resp)
 
 
-@router.get("/api/forecast/blended")
+@router.get("/api/forecast/blended", response_class=ORJSONResponse)
 def get_forecast_blended(
+    request: Request,
     start: str = Query(..., description="Start date YYYY-MM-DD"),
     end: str = Query(..., description="End date YYYY-MM-DD"),
     mu_daily: Optional[int] = Query(None, description="Mean daily variable spend in cents"),
@@ -721,14 +833,17 @@ def get_forecast_blended(
 
     dbp = _default_db_path()
 
+    # Derived stats slide with the current date, so today is part of the tag
+    etag = _etag(
+        dbp, "blended", start_d, end_d, mu_daily, sigma_daily, weekday_mult, band_k, datetime.utcnow().date()
+    )
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+
     # Deterministic baseline calendar balances for the horizon
     opening_as_of = start_d - timedelta(days=1)
-    opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp)
-    entries = expand_calendar(start_d, end_d, db_path=dbp)
-    balances_cal = compute_balances(opening_balance, entries)
-
     # Parameters: parse or compute from stats
-    mults: List[float]
+    mults: List[float] | None = None
     if weekday_mult:
         try:
             arr = json.loads(weekday_mult)
@@ -737,40 +852,43 @@ def get_forecast_blended(
             mults = [float(x) for x in arr]
         except Exception:
             raise HTTPException(status_code=400, detail="weekday_mult must be a JSON array of 7 numbers")
-    else:
-        txns = _load_transactions_for_stats(dbp, window_days=180)
-        mults = compute_weekday_multipliers(txns, window_days=180)
 
-    if mu_daily is None or sigma_daily is None:
-        txns = _load_transactions_for_stats(dbp, window_days=180)
-        mu_c, sigma_c = compute_daily_stats(txns, window_days=180)
-        if mu_daily is None:
-            mu_daily = mu_c
-        if sigma_daily is None:
-            sigma_daily = sigma_c
+    # One connection serves the opening balance, expansion and (on a cache miss) the stats window
+    with db_pool.connect(dbp) as conn:
+        opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, conn=conn)
+        entries = expand_calendar(start_d, end_d, conn=conn)
+        if mults is None or mu_daily is None or sigma_daily is None:
+            stats_mults, mu_c, sigma_c = _blended_params(dbp, window_days=180, conn=conn)
+            if mults is None:
+                mults = stats_mults
+            if mu_daily is None:
+                mu_daily = mu_c
+            if sigma_daily is None:
+                sigma_daily = sigma_c
+    balances_cal = compute_balances(opening_balance, entries)
 
     # Compute blended baseline and bands for each date we have a baseline point
     # We use the same sparse date set as the deterministic balances for consistency with the chart.
+    # The band half-width is constant across dates.
+    expected_by_wd = _expected_spend_by_weekday(mu_daily or 0, mults)
+    delta = int(round(float(band_k) * float(sigma_daily or 0)))
     blended: dict[date, int] = {}
     band_lower: dict[date, int] = {}
     band_upper: dict[date, int] = {}
 
-    for d, bal in sorted(balances_cal.items(), key=lambda kv: kv[0]):
-        w = d.weekday()  # 0=Mon..6=Sun
-        expected = int(round((mu_daily or 0) * float(mults[w])))
-        base = int(bal) - expected
-        k_sigma = float(band_k) * float(sigma_daily or 0)
-        delta = int(round(k_sigma))
+    # compute_balances yields dates in ascending order; date keys are formatted by the renderer
+    for d, bal in balances_cal.items():
+        base = int(bal) - expected_by_wd[d.weekday()]
         blended[d] = base
         band_lower[d] = base - delta
         band_upper[d] = base + delta
 
     resp = {
-        "baseline_calendar": {d.isoformat(): v for d, v in balances_cal.items()},
-        "baseline_blended": {d.isoformat(): v for d, v in blended.items()},
+        "baseline_calendar": balances_cal,
+        "baseline_blended": blended,
         "bands": {
-            "lower": {d.isoformat(): v for d, v in band_lower.items()},
-            "upper": {d.isoformat(): v for d, v in band_upper.items()},
+            "lower": band_lower,
+            "upper": band_upper,
         },
         "params": {
             "mu_daily_cents": int(mu_daily or 0),
@@ -778,14 +896,17 @@ def get_forecast_blended(
             "weekday_mult": mults,
             "k": band_k,
         },
-        "meta": {"horizon": {"start": start_d.isoformat(), "end": end_d.isoformat()}},
+        "meta": {"horizon": {"start": start_d, "end": end_d}},
     }
-    return resp
+    return ORJSONResponse(resp, headers={"ETag": etag, "Cache-Control": _FORECAST_CACHE_CONTROL})
 
 
 def _binary_search_max_spend(is_safe, lo: int, hi: int) -> int:
     """Generic binary search on integer domain to find the max value in [lo, hi]
     such that `is_safe(x)` is True. Assumes monotonic predicate (True then False).
+
+    The deterministic simulate-spend path has a closed form and does not need this;
+    it is kept for non-linear safety predicates.
     """
     best = lo
     while lo <= hi:
@@ -838,69 +959,65 @@ def post_forecast_simulate_spend(
 
     dbp = _default_db_path()
     opening_as_of = start_d - timedelta(days=1)
-    opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp)
-    entries = expand_calendar(start_d, end_d, db_path=dbp)
+    stats = None
+    with db_pool.connect(dbp) as conn:
+        opening_balance = compute_opening_balance_cents(as_of=opening_as_of, db_path=dbp, conn=conn)
+        entries = expand_calendar(start_d, end_d, conn=conn)
+        if mode.startswith("blended"):
+            try:
+                stats = _blended_params(dbp, window_days=180, conn=conn)
+            except Exception:
+                stats = None
+
+    # Optional reference blended baseline (does not affect decision): per-weekday expected spend
+    expected_by_wd: list[int] | None = None
+    if stats is not None:
+        try:
+            mults, mu_c, sigma_c = stats
+            expected_by_wd = _expected_spend_by_weekday(mu_c, mults)
+        except Exception:
+            expected_by_wd = None
 
-    # Deterministic baseline balances and min
+    # Deterministic baseline balances; one pass finds the min, the tight days after
+    # applying the spend, and the blended reference
     balances_base = compute_balances(opening_balance, entries)
-    # Sorted for deterministic min selection
-    items = sorted(balances_base.items(), key=lambda kv: kv[0])
-    if items:
-        min_bal = items[0][1]
-        min_date = items[0][0]
-        for d, bal in items:
-            if bal < min_bal:
-                min_bal = bal
-                min_date = d
-    else:
+    min_bal: Optional[int] = None
+    min_date: Optional[date] = None
+    tight_cutoff = buffer_floor + tight_thresh + amount_cents
+    tight_days: list[dict] = []
+    blended: dict[date, int] = {}
+    # compute_balances yields ascending dates: strict < keeps the earliest min, and tight days come out sorted
+    for d, bal in balances_base.items():
+        if min_bal is None or bal < min_bal:
+            min_bal, min_date = bal, d
+        # Only the first 50 tight days are reported, so stop building rows once there are 50
+        if bal <= tight_cutoff and len(tight_days) < 50:
+            tight_days.append({"date": d.isoformat(), "balance_cents": bal - amount_cents})
+        if expected_by_wd is not None:
+            blended[d] = bal - expected_by_wd[d.weekday()]
+    if min_bal is None:
         min_bal = opening_balance
         min_date = start_d
 
-    # Safety predicate is monotonic in spend amount: new_min = min_bal - x
-    def is_safe(x: int) -> bool:
-        return (min_bal - int(x)) >= buffer_floor
-
-    # Upper bound: at most the current margin to buffer floor
-    upper = max(0, min_bal - buffer_floor)
-    max_safe = _binary_search_max_spend(is_safe, 0, upper)
+    # A spend of x lowers every balance from spend_date on by x, so new_min = min_bal - x
+    # and the largest safe x is the margin to the buffer floor; no search needed
+    max_safe = max(0, min_bal - buffer_floor)
 
     # Evaluate provided amount
     new_min = min_bal - amount_cents
     # The min date remains the same (all subsequent balances are shifted uniformly)
     new_min_date = min_date
 
-    # Compute tight days after applying spend
-    # Shift all balances by -amount_cents from spend_date onward only on dates we have entries
-    tight_days: list[dict] = []
-    for d, bal in items:
-        adj = bal - amount_cents
-        if adj <= buffer_floor + tight_thresh:
-            tight_days.append({"date": d.isoformat(), "balance_cents": adj})
-    # Limit to a reasonable size
-    tight_days = sorted(tight_days, key=lambda x: x["date"])[:50]
-
-    # Optional reference blended baseline (does not affect decision)
     blended_ref = None
-    if mode.startswith("blended"):
-        try:
-            txns = _load_transactions_for_stats(dbp, window_days=180)
-            mults = compute_weekday_multipliers(txns, window_days=180)
-            mu_c, sigma_c = compute_daily_stats(txns, window_days=180)
-            blended: dict[str, int] = {}
-            for d, bal in items:
-                w = d.weekday()
-                expected = int(round(mu_c * float(mults[w])))
-                blended[d.isoformat()] = bal - expected
-            blended_ref = {
-                "baseline_blended": blended,
-                "params": {
-                    "mu_daily_cents": int(mu_c),
-                    "sigma_daily_cents": int(sigma_c),
-                    "weekday_mult": mults,
-                },
-            }
-        except Exception:
-            blended_ref = None
+    if expected_by_wd is not None:
+        blended_ref = {
+            "baseline_blended": blended,
+            "params": {
+                "mu_daily_cents": int(mu_c),
+                "sigma_daily_cents": int(sigma_c),
+                "weekday_mult": mults,
+            },
+        }
 
     resp = {
         "input": {
@@ -916,7 +1033,7 @@ def post_forecast_simulate_spend(
             "new_min_balance_cents": int(new_min),
             "new_min_balance_date": new_min_date.isoformat() if new_min_date else None,
             "tight_days": tight_days,
-            "notes": "Decision compares new_min_balance against buffer_floor; max_safe found via integer binary search.",
+            "notes": "Decision compares new_min_balance against buffer_floor; max_safe is the baseline margin to buffer_floor.",
         },
         "meta": {
             "opening_balance_cents": opening_balance,
@@ -927,4 +1044,4 @@ def post_forecast_simulate_spend(
     }
     if blended_ref is not None:
         resp["reference_blended"] = blended_ref
-    return resp
+    return ORJSONResponse(resp)
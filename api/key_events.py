@@ -1,25 +1,29 @@
 from __future__ import annotations
 
 import os
-import sqlite3
-from datetime import date
-from pathlib import Path
+from datetime import date, timedelta
 from typing import Optional, Dict, Any, List
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from security.deps import require_auth, require_csrf, rate_limit
 
 from forecast.calendar import _default_db_path
+from db import pool as db_pool
 
 
 router = APIRouter()
 
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+_KEY_EVENT_COLUMNS = (
+    "id, name, event_date, repeat_rule, planned_amount_cents, category_id, lead_time_days, shift_policy, account_id"
+)
+
+
+def _key_event_item(row) -> Dict[str, Any]:
+    """Response shape for a row selected/returned with _KEY_EVENT_COLUMNS."""
+    # Integer columns have INTEGER affinity and writes go through _validate_payload's
+    # int() checks, so sqlite3 already hands back int/None; no per-field coercion
+    return dict(row)
 
 
 def _require_csrf(request: Request) -> None:
@@ -94,45 +98,30 @@ def list_key_events(
     where = []
     params: list[Any] = []
 
+    # event_date is stored as ISO text starting with YYYY-MM-DD, so comparing the raw
+    # column (no DATE() wrapper) matches date order and can use idx_key_spend_events_event_date
     if from_date:
         try:
-            date.fromisoformat(from_date)
+            from_d = date.fromisoformat(from_date)
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid 'from' date; use YYYY-MM-DD")
-        where.append("DATE(event_date) >= ?")
-        params.append(from_date)
+        where.append("event_date >= ?")
+        params.append(from_d.isoformat())
     if to_date:
         try:
-            date.fromisoformat(to_date)
+            to_d = date.fromisoformat(to_date)
         except Exception:
             raise HTTPException(status_code=400, detail="Invalid 'to' date; use YYYY-MM-DD")
-        where.append("DATE(event_date) <= ?")
-        params.append(to_date)
+        where.append("event_date < ?")
+        params.append((to_d + timedelta(days=1)).isoformat())
 
-    sql = (
-        "SELECT id, name, event_date, repeat_rule, planned_amount_cents, category_id, lead_time_days, shift_policy, account_id "
-        "FROM key_spend_events"
-    )
+    sql = f"SELECT {_KEY_EVENT_COLUMNS} FROM key_spend_events"
     if where:
         sql += " WHERE " + " AND ".join(where)
-    sql += " ORDER BY DATE(event_date) ASC, id ASC"
-
-    with _connect(dbp) as conn:
-        rows = conn.execute(sql, params).fetchall()
-        return [
-            {
-                "id": int(r["id"]),
-                "name": r["name"],
-                "event_date": r["event_date"],
-                "repeat_rule": r["repeat_rule"],
-                "planned_amount_cents": int(r["planned_amount_cents"]) if r["planned_amount_cents"] is not None else None,
-                "category_id": int(r["category_id"]) if r["category_id"] is not None else None,
-                "lead_time_days": int(r["lead_time_days"]) if r["lead_time_days"] is not None else None,
-                "shift_policy": r["shift_policy"],
-                "account_id": int(r["account_id"]) if r["account_id"] is not None else None,
-            }
-            for r in rows
-        ]
+    sql += " ORDER BY event_date ASC, id ASC"
+
+    with db_pool.connect(dbp) as conn:
+        return [_key_event_item(r) for r in conn.execute(sql, params)]
 
 
 @router.post("/api/key-events")
@@ -146,75 +135,50 @@ async def upsert_key_event(request: Request) -> Dict[str, Any]:
         raise HTTPException(status_code=400, detail="Invalid JSON body")
 
     data = _validate_payload(payload)
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
-        cur = conn.cursor()
-        if payload.get("id") is not None:
-            try:
-                row_id = int(payload["id"])
-            except Exception:
-                raise HTTPException(status_code=400, detail="'id' must be integer")
-            # Update existing
-            cur.execute(
-                """
+    values = (
+        data["name"],
+        data["event_date"].isoformat(),
+        data["repeat_rule"],
+        data["planned_amount_cents"],
+        data["category_id"],
+        data["lead_time_days"],
+        data["shift_policy"],
+        data["account_id"],
+    )
+    row_id: Optional[int] = None
+    if payload.get("id") is not None:
+        try:
+            row_id = int(payload["id"])
+        except Exception:
+            raise HTTPException(status_code=400, detail="'id' must be integer")
+
+    def _write(conn):
+        # RETURNING hands back the stored row, so no follow-up SELECT
+        if row_id is not None:
+            row = conn.execute(
+                f"""
                 UPDATE key_spend_events
                 SET name = ?, event_date = ?, repeat_rule = ?, planned_amount_cents = ?,
                     category_id = ?, lead_time_days = ?, shift_policy = ?, account_id = ?
                 WHERE id = ?
+                RETURNING {_KEY_EVENT_COLUMNS}
                 """,
-                (
-                    data["name"],
-                    data["event_date"].isoformat(),
-                    data["repeat_rule"],
-                    data["planned_amount_cents"],
-                    data["category_id"],
-                    data["lead_time_days"],
-                    data["shift_policy"],
-                    data["account_id"],
-                    row_id,
-                ),
-            )
-            if cur.rowcount == 0:
+                (*values, row_id),
+            ).fetchone()
+            if row is None:
                 raise HTTPException(status_code=404, detail="Key event not found")
-            conn.commit()
-            event_id = row_id
-        else:
-            # Insert new
-            cur.execute(
-                """
-                INSERT INTO key_spend_events(name, event_date, repeat_rule, planned_amount_cents, category_id, lead_time_days, shift_policy, account_id)
-                VALUES (?,?,?,?,?,?,?,?)
-                """,
-                (
-                    data["name"],
-                    data["event_date"].isoformat(),
-                    data["repeat_rule"],
-                    data["planned_amount_cents"],
-                    data["category_id"],
-                    data["lead_time_days"],
-                    data["shift_policy"],
-                    data["account_id"],
-                ),
-            )
-            conn.commit()
-            event_id = int(cur.lastrowid)
-
-        # Return the row
-        row = conn.execute(
-            "SELECT id, name, event_date, repeat_rule, planned_amount_cents, category_id, lead_time_days, shift_policy, account_id FROM key_spend_events WHERE id = ?",
-            (event_id,),
+            return row
+        return conn.execute(
+            f"""
+            INSERT INTO key_spend_events(name, event_date, repeat_rule, planned_amount_cents, category_id, lead_time_days, shift_policy, account_id)
+            VALUES (?,?,?,?,?,?,?,?)
+            RETURNING {_KEY_EVENT_COLUMNS}
+            """,
+            values,
         ).fetchone()
-        return {
-            "id": int(row["id"]),
-            "name": row["name"],
-            "event_date": row["event_date"],
-            "repeat_rule": row["repeat_rule"],
-            "planned_amount_cents": int(row["planned_amount_cents"]) if row["planned_amount_cents"] is not None else None,
-            "category_id": int(row["category_id"]) if row["category_id"] is not None else None,
-            "lead_time_days": int(row["lead_time_days"]) if row["lead_time_days"] is not None else None,
-            "shift_policy": row["shift_policy"],
-            "account_id": int(row["account_id"]) if row["account_id"] is not None else None,
-        }
+
+    row = await db_pool.run(_default_db_path(), _write, write=True)
+    return _key_event_item(row)
 
 
 @router.delete("/api/key-events/{event_id}")
@@ -222,10 +186,11 @@ async def delete_key_event(event_id: int, request: Request) -> Dict[str, Any]:
     require_auth(request)
     require_csrf(request)
     rate_limit(request, scope="key-events-write")
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
+
+    def _write(conn):
         cur = conn.execute("DELETE FROM key_spend_events WHERE id = ?", (event_id,))
         if cur.rowcount == 0:
             raise HTTPException(status_code=404, detail="Key event not found")
-        conn.commit()
-        return {"status": "deleted", "id": event_id}
+
+    await db_pool.run(_default_db_path(), _write, write=True)
+    return {"status": "deleted", "id": event_id}
@@ -2,52 +2,100 @@ from __future__ import annotations
 
 import csv
 import hashlib
-import io
 import json
+import logging
 import os
+import threading
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional, TextIO
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
 from security.deps import require_auth, require_csrf, rate_limit
 
+from db.pool import db_state_stamp
+from forecast.calendar import _default_db_path, today_tz
 from q.packs import assemble_pack
 
 
 router = APIRouter()
+logger = logging.getLogger("uvicorn.error")
 
 
 EXPORT_DIR = Path(os.getenv("EXPORT_DIR") or "localdb/exports")
 
 
+# Export file names whose background write has not finished yet (this process only)
+_PENDING_EXPORTS: set[str] = set()
+_PENDING_LOCK = threading.Lock()
+
+_PACK_CACHE: Dict[tuple, Dict[str, Any]] = {}
+_PACK_CACHE_SIZE = 16
+_PACK_CACHE_LOCK = threading.Lock()
+
+
+def _assemble_pack_cached(pack: str, period: Optional[str]) -> Dict[str, Any]:
+    """assemble_pack memoized per (pack, period) while the DB and today's date are unchanged.
+
+    Exporting CSV, then PDF, then both for one pack reuses a single assembly.
+    Callers must treat the result as read-only; redact_pack returns a copy.
+    """
+    dbp = _default_db_path()
+    key = (str(dbp), pack, period, today_tz().isoformat()) + db_state_stamp(dbp)
+    hit = _PACK_CACHE.get(key)
+    if hit is None:
+        hit = assemble_pack(pack, period)
+        with _PACK_CACHE_LOCK:
+            while len(_PACK_CACHE) >= _PACK_CACHE_SIZE:
+                # Oldest entry first (dicts keep insertion order)
+                del _PACK_CACHE[next(iter(_PACK_CACHE))]
+            _PACK_CACHE[key] = hit
+    return hit
+
+
 def _stable_serialize(obj: Any) -> str:
     """Stable JSON serialization for hashing (sorted keys, compact)."""
     return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
 
 
 def redact_pack(pack: Dict[str, Any], *, include_pii: bool = False, include_memos: bool = False) -> Dict[str, Any]:
-    """Return a shallowly-redacted copy of the pack for export stability.
+    """Return a redacted view of the pack for export stability.
 
-    Redacts known PII fields (payee, memo) unless toggled on.
+    Redacts known PII fields (payee, memo) unless toggled on. Containers are
+    copied only along paths that contain a redaction; untouched subtrees are
+    shared with `pack`, so treat the result as read-only.
     """
-    def _redact_inplace(d: Any) -> Any:
+    if include_pii and include_memos:
+        return pack
+
+    def _redact(d: Any) -> Any:
         if isinstance(d, dict):
-            out = {}
+            out = None
             for k, v in d.items():
                 if not include_pii and k in ("payee", "payee_name"):
-                    out[k] = "REDACTED"
+                    nv = "REDACTED"
                 elif not include_memos and k == "memo":
-                    out[k] = None
+                    nv = None
                 else:
-                    out[k] = _redact_inplace(v)
-            return out
+                    nv = _redact(v)
+                if nv is not v:
+                    if out is None:
+                        out = dict(d)
+                    out[k] = nv
+            return d if out is None else out
         if isinstance(d, list):
-            return [_redact_inplace(x) for x in d]
+            out_list = None
+            for i, x in enumerate(d):
+                nx = _redact(x)
+                if nx is not x:
+                    if out_list is None:
+                        out_list = list(d)
+                    out_list[i] = nx
+            return d if out_list is None else out_list
         return d
 
-    return _redact_inplace(pack)
+    return _redact(pack)
 
 
 def compute_export_hash(pack_data: Dict[str, Any], generated_at_iso: str) -> str:
@@ -56,9 +104,15 @@ def compute_export_hash(pack_data: Dict[str, Any], generated_at_iso: str) -> str
     return hashlib.sha256(payload).hexdigest()
 
 
-def _write_csv(pack: Dict[str, Any], *, hash_hex: str, generated_at_iso: str) -> bytes:
-    buf = io.StringIO()
-    w = csv.writer(buf)
+def _row_table(rows: list) -> tuple[list[str], list[Dict[str, Any]]]:
+    """Sorted union of row keys (stable header) and the dict rows, filtered once for both renderers."""
+    dict_rows = [r for r in rows if isinstance(r, dict)]
+    return sorted({k for r in dict_rows for k in r}), dict_rows
+
+
+def _write_csv(pack: Dict[str, Any], sink: TextIO, *, hash_hex: str, generated_at_iso: str) -> None:
+    """Write the CSV export rows to `sink` (open it with newline="" as the csv module expects)."""
+    w = csv.writer(sink)
 
     w.writerow(["Pack", pack.get("pack"), "Period", pack.get("period")])
     for section in pack.get("sections", []) or []:
@@ -73,17 +127,21 @@ def _write_csv(pack: Dict[str, Any], *, hash_hex: str, generated_at_iso: str) ->
             # Rows, if present
             rows = item.get("rows")
             if isinstance(rows, list) and rows:
-                # Derive a header from keys across rows (stable order)
-                header_keys = sorted({k for r in rows if isinstance(r, dict) for k in r.keys()})
+                header_keys, dict_rows = _row_table(rows)
                 w.writerow(["Rows"] + header_keys)
-                for r in rows:
-                    if isinstance(r, dict):
-                        w.writerow([""] + [r.get(k) for k in header_keys])
+                w.writerows([""] + [r.get(k) for k in header_keys] for r in dict_rows)
     w.writerow([])
     w.writerow(["Hash", hash_hex])
     w.writerow(["Generated At", generated_at_iso])
 
-    return buf.getvalue().encode("utf-8")
+
+def _esc_html(s: Any) -> str:
+    """Escape &, < and > for HTML text; numbers and None need no scanning."""
+    if s is None or type(s) is int or type(s) is bool:
+        return str(s)
+    # Chained replace beats str.translate here: the three scans run in C on
+    # short ASCII cells, while translate goes through a per-character dict lookup
+    return str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
 def _render_pdf_html(pack: Dict[str, Any], *, hash_hex: str, generated_at_iso: str) -> str:
@@ -91,11 +149,7 @@ def _render_pdf_html(pack: Dict[str, Any], *, hash_hex: str, generated_at_iso: s
 
     We intentionally keep this self-contained without external PDF libs per task notes.
     """
-    def esc(s: Any) -> str:
-        try:
-            return str(s).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        except Exception:
-            return str(s)
+    esc = _esc_html
 
     parts: list[str] = []
     parts.append("<html><head><meta charset='utf-8'><title>Questionnaire Export</title>")
@@ -119,17 +173,16 @@ def _render_pdf_html(pack: Dict[str, Any], *, hash_hex: str, generated_at_iso: s
             parts.append("</tbody></table>")
             rows = item.get("rows")
             if isinstance(rows, list) and rows:
-                header_keys = sorted({k for r in rows if isinstance(r, dict) for k in r.keys()})
+                header_keys, dict_rows = _row_table(rows)
                 parts.append("<table><thead><tr>")
                 for k in header_keys:
                     parts.append(f"<th>{esc(k)}</th>")
                 parts.append("</tr></thead><tbody>")
-                for r in rows:
-                    if isinstance(r, dict):
-                        parts.append("<tr>")
-                        for k in header_keys:
-                            parts.append(f"<td>{esc(r.get(k))}</td>")
-                        parts.append("</tr>")
+                for r in dict_rows:
+                    parts.append("<tr>")
+                    for k in header_keys:
+                        parts.append(f"<td>{esc(r.get(k))}</td>")
+                    parts.append("</tr>")
                 parts.append("</tbody></table>")
     parts.append("<hr>")
     parts.append(f"<div class='muted'>Hash: {esc(hash_hex)}</div>")
@@ -138,6 +191,50 @@ def _render_pdf_html(pack: Dict[str, Any], *, hash_hex: str, generated_at_iso: s
     return "".join(parts)
 
 
+def _failed_marker(path: Path) -> Path:
+    return path.with_name(path.name + ".failed")
+
+
+def _write_export_file(path: Path, write: Callable[[TextIO], None], *, newline: Optional[str] = None) -> None:
+    """Background writer: render into a temp file and rename it over `path`.
+
+    The rename means /exports never serves a partial file. A failure is logged
+    and leaves a `.failed` marker next to the target for the status route.
+    """
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8", newline=newline) as f:
+            write(f)
+        os.replace(tmp, path)
+    except Exception as exc:
+        logger.exception(f"Export write failed for {path.name}: {exc}")
+        tmp.unlink(missing_ok=True)
+        try:
+            _failed_marker(path).write_text(f"{type(exc).__name__}: {exc}\n", encoding="utf-8")
+        except OSError:
+            logger.exception(f"Could not record export failure for {path.name}")
+    finally:
+        with _PENDING_LOCK:
+            _PENDING_EXPORTS.discard(path.name)
+
+
+def _write_csv_file(pack: Dict[str, Any], path: Path, hash_hex: str, generated_at_iso: str) -> None:
+    _write_export_file(
+        path, lambda f: _write_csv(pack, f, hash_hex=hash_hex, generated_at_iso=generated_at_iso), newline=""
+    )
+
+
+def _write_pdf_file(pack: Dict[str, Any], path: Path, hash_hex: str, generated_at_iso: str) -> None:
+    _write_export_file(
+        path, lambda f: f.write(_render_pdf_html(pack, hash_hex=hash_hex, generated_at_iso=generated_at_iso))
+    )
+
+
+def _mark_pending(path: Path) -> None:
+    with _PENDING_LOCK:
+        _PENDING_EXPORTS.add(path.name)
+
+
 @dataclass
 class ExportRequest:
     pack: str
@@ -148,7 +245,7 @@ class ExportRequest:
 
 
 @router.post("/api/q/export")
-def export_pack(req: ExportRequest, request: Request):  # type: ignore[valid-type]
+def export_pack(req: ExportRequest, request: Request, background_tasks: BackgroundTasks):  # type: ignore[valid-type]
     # Protect export generation behind admin auth when configured
     require_auth(request)
     require_csrf(request)
@@ -158,8 +255,8 @@ def export_pack(req: ExportRequest, request: Request):  # type: ignore[valid-typ
     if fmt not in ("csv", "pdf", "both"):
         raise HTTPException(status_code=400, detail="format must be one of: csv, pdf, both")
 
-    # Assemble pack
-    pack = assemble_pack(req.pack, req.period)
+    # Assemble pack (reused across formats while the DB is unchanged)
+    pack = _assemble_pack_cached(req.pack, req.period)
     if pack.get("error"):
         raise HTTPException(status_code=404, detail=f"Unknown pack: {req.pack}")
 
@@ -179,18 +276,39 @@ def export_pack(req: ExportRequest, request: Request):  # type: ignore[valid-typ
         "generated_at": ts,
     }
 
+    # URLs are known up front; rendering and disk writes run after the response is sent
     if fmt in ("csv", "both"):
-        csv_bytes = _write_csv(redacted, hash_hex=hash_hex, generated_at_iso=ts)
         csv_path = EXPORT_DIR / f"{base}.csv"
-        with open(csv_path, "wb") as f:
-            f.write(csv_bytes)
+        # The hash covers the pack data, not the CSV bytes
+        _mark_pending(csv_path)
+        background_tasks.add_task(_write_csv_file, redacted, csv_path, hash_hex, ts)
         resp["csv_url"] = f"/exports/{csv_path.name}"
 
     if fmt in ("pdf", "both"):
-        html = _render_pdf_html(redacted, hash_hex=hash_hex, generated_at_iso=ts)
         pdf_path = EXPORT_DIR / f"{base}.pdf.html"
-        with open(pdf_path, "w", encoding="utf-8") as f:
-            f.write(html)
+        _mark_pending(pdf_path)
+        background_tasks.add_task(_write_pdf_file, redacted, pdf_path, hash_hex, ts)
         resp["pdf_url"] = f"/exports/{pdf_path.name}"
 
+    resp["status"] = "queued"
     return resp
+
+
+@router.get("/api/q/export/status/{name}")
+def export_status(name: str, request: Request):
+    """Where a queued export file stands: queued, ready, or failed (with the recorded error)."""
+    require_auth(request)
+    # Bare file names only; never resolve paths outside EXPORT_DIR
+    if not name or name != Path(name).name or name.startswith(".") or name.endswith((".tmp", ".failed")):
+        raise HTTPException(status_code=400, detail="Invalid export file name")
+    path = EXPORT_DIR / name
+    marker = _failed_marker(path)
+    if marker.exists():
+        return {"file": name, "status": "failed", "error": marker.read_text(encoding="utf-8").strip()}
+    if path.exists():
+        return {"file": name, "status": "ready", "url": f"/exports/{name}"}
+    with _PENDING_LOCK:
+        pending = name in _PENDING_EXPORTS
+    if pending:
+        return {"file": name, "status": "queued"}
+    raise HTTPException(status_code=404, detail="Unknown export file")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None  # type: ignore
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed.
+
+    Return it directly from a handler (`return ORJSONResponse(payload)`) so
+    FastAPI skips its jsonable_encoder walk; orjson serializes dates,
+    datetimes and dataclasses natively. Falls back to the stdlib encoder.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def ndjson_line(obj: Any) -> bytes:
+    """Encode one NDJSON record (compact JSON plus a trailing newline)."""
+    if orjson is None:
+        return json.dumps(obj, separators=(",", ":")).encode() + b"\n"
+    return orjson.dumps(obj) + b"\n"
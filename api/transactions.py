@@ -1,39 +1,104 @@
 from __future__ import annotations
 
-from datetime import date
+import base64
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-import sqlite3
 import uuid
 
 from fastapi import APIRouter, HTTPException, Query, Request
 
-from forecast.calendar import _default_db_path
+from api.responses import ORJSONResponse
+from db import pool as db_pool
+from db.pool import db_state_stamp
+from forecast.calendar import _IN_JSON_IDS, _default_db_path, _json_id_list, parse_account_ids
 from security.deps import require_auth, require_csrf, rate_limit
 
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+_ACCOUNT_NAMES_CACHE: dict[tuple, dict[int, str]] = {}
+_ACCOUNT_NAMES_CACHE_SIZE = 8
+_ACCOUNT_NAMES_LOCK = threading.Lock()
 
 
-def _parse_accounts_param(val: str | None) -> list[int] | None:
-    if not val:
-        return None
-    out: list[int] = []
-    for part in val.split(","):
-        part = part.strip()
-        if not part:
-            continue
-        try:
-            out.append(int(part))
-        except Exception:
-            continue
-    return out or None
+def _account_names(conn, db_path: Path) -> dict[int, str]:
+    """id -> name for every account, cached until the DB changes.
+
+    Page items take their account name from here; the queries only probe accounts for existence.
+    """
+    key = (str(db_path),) + db_state_stamp(db_path)
+    hit = _ACCOUNT_NAMES_CACHE.get(key)
+    if hit is None:
+        hit = {int(r["id"]): r["name"] for r in conn.execute("SELECT id, name FROM accounts")}
+        with _ACCOUNT_NAMES_LOCK:
+            while len(_ACCOUNT_NAMES_CACHE) >= _ACCOUNT_NAMES_CACHE_SIZE:
+                # Oldest entry first (dicts keep insertion order)
+                del _ACCOUNT_NAMES_CACHE[next(iter(_ACCOUNT_NAMES_CACHE))]
+            _ACCOUNT_NAMES_CACHE[key] = hit
+    return hit
+
+
+def prewarm_transactions(db_path: Path) -> None:
+    """Read the ledger once so the first list request is served from memory.
+
+    With the pool's mmap the pages sit in the OS page cache shared by every pooled
+    connection. Run it after migrations, off the event loop (main.startup does).
+    """
+    with db_pool.connect(db_path) as conn:
+        conn.execute("SELECT COUNT(*), SUM(LENGTH(payee)), SUM(LENGTH(memo)) FROM transactions").fetchone()
+
+
+@lru_cache(maxsize=8)
+def _has_transactions_fts(db_path_str: str) -> bool:
+    """True when migration 0012 (trigram FTS index over payee/memo) is applied.
+
+    Cached per DB; startup runs migrations before the first request.
+    """
+    with db_pool.connect(Path(db_path_str)) as conn:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'"
+        ).fetchone()
+    return row is not None
+
+
+def _fts_phrase(q: str) -> str:
+    """Quote `q` as one FTS5 phrase so operators and punctuation are matched literally."""
+    return '"' + q.replace('"', '""') + '"'
+
+
+def _encode_cursor(posted_at: str, idempotency_key: str) -> str:
+    return base64.urlsafe_b64encode(f"{posted_at}|{idempotency_key}".encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    """Inverse of _encode_cursor; posted_at never contains '|', so split on the first one."""
+    try:
+        posted_at, key = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return posted_at, key
+
+
+def _transaction_item(row: tuple, account_names: dict[int, str]) -> dict:
+    """Item for a plain-tuple row in the page query's SELECT column order."""
+    idem, posted_at, amount, payee, memo, source, category_id, is_cleared, account_id, splits = row
+    return {
+        "idempotency_key": idem,
+        "posted_at": posted_at,
+        "amount_cents": int(amount),
+        "payee": payee,
+        "memo": memo,
+        "source": source,
+        "category_id": int(category_id) if category_id is not None else None,
+        "is_cleared": int(is_cleared) == 1,
+        "account": {"id": int(account_id), "name": account_names.get(account_id)},
+        "splits_total_cents": int(splits),
+        "has_splits": int(splits) > 0,
+    }
 
 
 @router.get("/api/transactions")
@@ -45,75 +110,94 @@ def list_transactions(
     q: Optional[str] = Query(None, description="Search in payee or memo (case-insensitive)"),
     limit: int = Query(200, ge=1, le=2000),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (preferred over offset)"),
 ):
+    """Page of transactions, newest first.
+
+    Ordering is the raw posted_at string descending, then idempotency_key descending,
+    so it can be read straight off an index. Within one day, rows stored with a time
+    (CSV imports write YYYY-MM-DDT00:00:00Z) sort before rows stored as a bare
+    YYYY-MM-DD (quick-add); before migration 0010 both sorted as the same instant and
+    only the key broke the tie. Cursor pages follow the same order.
+    """
     dbp = _default_db_path()
+    after = _decode_cursor(cursor) if cursor else None
     try:
         start_d = date.fromisoformat(start) if start else None
         end_d = date.fromisoformat(end) if end else None
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid date format; use YYYY-MM-DD")
 
-    acct_ids = _parse_accounts_param(accounts)
+    acct_ids = parse_account_ids(accounts)
 
-    where = ["1=1"]
+    # Same rows the old accounts join returned: transactions whose account row is
+    # missing stay out of the page and the total (foreign keys are not enforced)
+    where = ["t.account_id IN (SELECT id FROM accounts)"]
     params: list = []
+    # posted_at always starts with YYYY-MM-DD, so raw string ranges match DATE() and can use an index
     if start_d:
-        where.append("DATE(t.posted_at) >= ?")
+        where.append("t.posted_at >= ?")
         params.append(start_d.isoformat())
     if end_d:
-        where.append("DATE(t.posted_at) <= ?")
-        params.append(end_d.isoformat())
+        where.append("t.posted_at < ?")
+        params.append((end_d + timedelta(days=1)).isoformat())
     if acct_ids:
-        marks = ",".join(["?"] * len(acct_ids))
-        where.append(f"t.account_id IN ({marks})")
-        params.extend([int(x) for x in acct_ids])
+        # One JSON array bind keeps the SQL text independent of how many accounts are picked,
+        # so each filter combination maps to a single cached statement
+        where.append(f"t.account_id IN {_IN_JSON_IDS}")
+        params.append(_json_id_list(acct_ids))
     if cleared in ("0", "1"):
         where.append("t.is_cleared = ?")
         params.append(int(cleared))
     if q:
-        where.append("(LOWER(t.payee) LIKE ? OR LOWER(t.memo) LIKE ?)")
         needle = f"%{q.lower()}%"
+        # Trigrams need 3+ characters; shorter needles (and DBs without 0012) scan with LIKE
+        if len(q) >= 3 and _has_transactions_fts(str(dbp)):
+            # The index only narrows the candidates: it is keyed on the implicit rowid, which a
+            # VACUUM can renumber, so matches are re-checked against the row's own text
+            where.append("t.rowid IN (SELECT rowid FROM transactions_fts WHERE transactions_fts MATCH ?)")
+            params.append(_fts_phrase(q))
+        where.append("(LOWER(t.payee) LIKE ? OR LOWER(t.memo) LIKE ?)")
         params.extend([needle, needle])
 
-    sql = f"""
-        SELECT t.idempotency_key, t.posted_at, t.amount_cents, t.payee, t.memo,
-               t.source, t.category_id, t.is_cleared,
-               a.id AS account_id, a.name AS account_name,
-               (SELECT COALESCE(SUM(ts.amount_cents), 0) FROM transaction_splits ts WHERE ts.transaction_idempotency_key = t.idempotency_key) AS splits_total
-        FROM transactions t
-        JOIN accounts a ON a.id = t.account_id
-        WHERE {' AND '.join(where)}
-        ORDER BY datetime(t.posted_at) DESC, t.idempotency_key DESC
-        LIMIT ? OFFSET ?
-    """
-    params_paged = params + [int(limit), int(offset)]
+    # Pooled connection: PRAGMAs are applied once and the statement cache stays warm
+    with db_pool.connect(dbp) as conn:
+        # Keyset paging: seek past the previous page's last row instead of skipping `offset` rows
+        if after:
+            seek = " AND (t.posted_at, t.idempotency_key) < (?, ?)"
+            params_paged = params + [after[0], after[1], int(limit), 0]
+        else:
+            seek = ""
+            params_paged = params + [int(limit), int(offset)]
+
+        # Column order is what _transaction_item unpacks
+        sql = f"""
+            SELECT t.idempotency_key, t.posted_at, t.amount_cents, t.payee, t.memo,
+                   t.source, t.category_id, t.is_cleared, t.account_id,
+                   (SELECT COALESCE(SUM(ts.amount_cents), 0) FROM transaction_splits ts WHERE ts.transaction_idempotency_key = t.idempotency_key) AS splits_total
+            FROM transactions t
+            WHERE {' AND '.join(where)}{seek}
+            ORDER BY t.posted_at DESC, t.idempotency_key DESC
+            LIMIT ? OFFSET ?
+        """
 
-    with _connect(dbp) as conn:
-        rows = conn.execute(sql, params_paged).fetchall()
+        # Build items straight off the cursor; plain tuples skip sqlite3.Row's by-name lookups
+        cur = conn.cursor()
+        cur.row_factory = None
+        # Account names come from an in-process map rather than a join
+        names = _account_names(conn, dbp)
+        items = [_transaction_item(r, names) for r in cur.execute(sql, params_paged)]
         total = conn.execute(
-            f"SELECT COUNT(*) AS n FROM transactions t JOIN accounts a ON a.id=t.account_id WHERE {' AND '.join(where)}",
+            f"SELECT COUNT(*) AS n FROM transactions t WHERE {' AND '.join(where)}",
             params,
         ).fetchone()[0]
 
+    last = items[-1] if len(items) == limit else None
     return {
         "total": int(total),
-        "count": len(rows),
-        "items": [
-            {
-                "idempotency_key": r["idempotency_key"],
-                "posted_at": r["posted_at"],
-                "amount_cents": int(r["amount_cents"]),
-                "payee": r["payee"],
-                "memo": r["memo"],
-                "source": r["source"],
-                "category_id": int(r["category_id"]) if r["category_id"] is not None else None,
-                "is_cleared": int(r["is_cleared"]) == 1,
-                "account": {"id": int(r["account_id"]), "name": r["account_name"]},
-                "splits_total_cents": int(r["splits_total"]),
-                "has_splits": int(r["splits_total"]) > 0,
-            }
-            for r in rows
-        ],
+        "count": len(items),
+        "next_cursor": _encode_cursor(last["posted_at"], last["idempotency_key"]) if last else None,
+        "items": items,
     }
 
 
@@ -167,18 +251,25 @@ async def quick_add_transaction(request: Request):
         except (ValueError, TypeError):
             raise HTTPException(status_code=400, detail="'category_id' must be an integer")
 
-    dbp = _default_db_path()
-    with _connect(dbp) as conn:
+    idem = f"quick-{uuid.uuid4()}"
+    # Store transaction (negative = outflow in this system)
+    if amount_cents > 0:
+        amount_cents = -abs(amount_cents)
+
+    account_id = payload.get("account_id")
+    if account_id is not None:
+        try:
+            account_id = int(account_id)
+        except (ValueError, TypeError):
+            raise HTTPException(status_code=400, detail="'account_id' must be an integer")
+
+    def _write(conn) -> int:
         # Resolve account
-        account_id = payload.get("account_id")
         if account_id is not None:
-            try:
-                account_id = int(account_id)
-            except (ValueError, TypeError):
-                raise HTTPException(status_code=400, detail="'account_id' must be an integer")
             row = conn.execute("SELECT 1 FROM accounts WHERE id = ?", (account_id,)).fetchone()
             if not row:
                 raise HTTPException(status_code=404, detail=f"Account {account_id} not found")
+            acct = account_id
         else:
             # Default to first active account
             row = conn.execute(
@@ -186,13 +277,8 @@ async def quick_add_transaction(request: Request):
             ).fetchone()
             if not row:
                 raise HTTPException(status_code=400, detail="No active accounts found; create an account first")
-            account_id = int(row["id"])
+            acct = int(row["id"])
 
-        # Store transaction (negative = outflow in this system)
-        if amount_cents > 0:
-            amount_cents = -abs(amount_cents)
-
-        idem = f"quick-{uuid.uuid4()}"
         conn.execute(
             """
             INSERT INTO transactions(
@@ -200,9 +286,11 @@ async def quick_add_transaction(request: Request):
                 category_id, source, is_cleared
             ) VALUES (?,?,?,?,?,?,?,?,?)
             """,
-            (idem, account_id, posted_at, amount_cents, payee, memo, category_id, "quick-add", 1),
+            (idem, acct, posted_at, amount_cents, payee, memo, category_id, "quick-add", 1),
         )
-        conn.commit()
+        return acct
+
+    account_id = await db_pool.run(_default_db_path(), _write, write=True)
 
     return {
         "status": "ok",
@@ -4,7 +4,9 @@ import json
 import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from db import pool as db_pool
 
 
 @dataclass(frozen=True)
@@ -15,10 +17,12 @@ class Suggestion:
     category_name: Optional[str] = None
 
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Resolves an internal category name to (id, name), or None when absent.
+_CategoryLookup = Callable[[str], Optional[Tuple[int, str]]]
+
+
+def _connect(db_path: Path):
+    return db_pool.connect(db_path)
 
 
 def _find_internal_category_id(conn: sqlite3.Connection, name: str) -> Optional[Tuple[int, str]]:
@@ -32,7 +36,16 @@ def _find_internal_category_id(conn: sqlite3.Connection, name: str) -> Optional[
     return None
 
 
-def _keyword_guess(conn: sqlite3.Connection, text: str) -> Optional[Tuple[int, str, float, str]]:
+def _load_internal_categories(conn: sqlite3.Connection) -> Dict[str, Tuple[int, str]]:
+    out: Dict[str, Tuple[int, str]] = {}
+    for row in conn.execute(
+        "SELECT id, name FROM categories WHERE (source IS NULL OR source='internal') ORDER BY rowid"
+    ):
+        out.setdefault(str(row["name"]), (int(row["id"]), str(row["name"])))
+    return out
+
+
+def _keyword_guess(find_category: _CategoryLookup, text: str) -> Optional[Tuple[int, str, float, str]]:
     """Very simple keyword-to-category heuristics that map to existing internal categories if present.
 
     Returns (category_id, category_name, confidence, note) or None.
@@ -66,77 +79,129 @@ def _keyword_guess(conn: sqlite3.Connection, text: str) -> Optional[Tuple[int, s
     ]
     for kw, cat_name in candidates:
         if kw in text_l:
-            found = _find_internal_category_id(conn, cat_name)
+            found = find_category(cat_name)
             if found:
                 cid, cname = found
                 return cid, cname, 0.55, f"keyword match '{kw}' -> {cname}"
     return None
 
 
-def suggest(
-    db_path: Path,
-    *,
-    payee: Optional[str] = None,
-    memo: Optional[str] = None,
-    csv_category: Optional[str] = None,
-) -> Suggestion:
-    """Suggest an internal category id for a transaction-like item.
+def _load_payee_rules() -> Optional[List[sqlite3.Row]]:
+    try:
+        from localdb import payee_db  # lazy import
 
-    Heuristics order:
-    1) Local payee rules (from localdb.payee_db) → map suggested_subcategory to an internal category id by name.
-    2) CSV category name (when present) → internal category by exact name.
-    3) Keyword features on payee+memo.
+        return payee_db.load_rules()
+    except Exception:
+        return None
 
-    Never writes to the DB — returns only suggestions.
-    """
+
+def _suggest_one(
+    find_category: _CategoryLookup,
+    rules: Optional[List[sqlite3.Row]],
+    *,
+    payee: Optional[str],
+    memo: Optional[str],
+    csv_category: Optional[str],
+) -> Suggestion:
     payee_s = (payee or "").strip()
     memo_s = (memo or "").strip()
 
-    with _connect(db_path) as conn:
-        # 1) Payee rules
+    # 1) Payee rules
+    match = None
+    if payee_s and rules is not None:
         try:
             from localdb import payee_db  # lazy import
 
-            match = payee_db.match_payee(payee_s) if payee_s else None
+            match = payee_db.match_payee_in(payee_s, rules)
         except Exception:
             match = None
 
-        if match:
-            # Prefer subcategory if provided; fall back to category
-            sub = match.get("suggested_subcategory") or match.get("suggested_category")
-            if sub:
-                found = _find_internal_category_id(conn, str(sub))
-                if found:
-                    cid, cname = found
-                    conf = float(match.get("confidence") or 0.8)
-                    return Suggestion(
-                        category_id=cid,
-                        category_name=cname,
-                        confidence=conf,
-                        notes=f"payee rule match ({match.get('match_type')}:{match.get('pattern')})",
-                    )
-
-        # 2) CSV category name → internal category by exact name
-        if csv_category:
-            found = _find_internal_category_id(conn, csv_category)
+    if match:
+        # Prefer subcategory if provided; fall back to category
+        sub = match.get("suggested_subcategory") or match.get("suggested_category")
+        if sub:
+            found = find_category(str(sub))
             if found:
                 cid, cname = found
+                conf = float(match.get("confidence") or 0.8)
                 return Suggestion(
                     category_id=cid,
                     category_name=cname,
-                    confidence=0.6,
-                    notes="csv category name match",
+                    confidence=conf,
+                    notes=f"payee rule match ({match.get('match_type')}:{match.get('pattern')})",
                 )
 
-        # 3) Keyword guesses on payee+memo
-        guess = _keyword_guess(conn, f"{payee_s} {memo_s}")
-        if guess:
-            cid, cname, conf, note = guess
-            return Suggestion(category_id=cid, category_name=cname, confidence=conf, notes=note)
+    # 2) CSV category name → internal category by exact name
+    if csv_category:
+        found = find_category(csv_category)
+        if found:
+            cid, cname = found
+            return Suggestion(
+                category_id=cid,
+                category_name=cname,
+                confidence=0.6,
+                notes="csv category name match",
+            )
+
+    # 3) Keyword guesses on payee+memo
+    guess = _keyword_guess(find_category, f"{payee_s} {memo_s}")
+    if guess:
+        cid, cname, conf, note = guess
+        return Suggestion(category_id=cid, category_name=cname, confidence=conf, notes=note)
 
     return Suggestion(category_id=None, category_name=None, confidence=0.0, notes="no suggestion")
 
 
+def suggest(
+    db_path: Path,
+    *,
+    payee: Optional[str] = None,
+    memo: Optional[str] = None,
+    csv_category: Optional[str] = None,
+) -> Suggestion:
+    """Suggest an internal category id for a transaction-like item.
+
+    Heuristics order:
+    1) Local payee rules (from localdb.payee_db) → map suggested_subcategory to an internal category id by name.
+    2) CSV category name (when present) → internal category by exact name.
+    3) Keyword features on payee+memo.
+
+    Never writes to the DB — returns only suggestions.
+    """
+    rules = _load_payee_rules() if (payee or "").strip() else None
+    with _connect(db_path) as conn:
+        return _suggest_one(
+            lambda name: _find_internal_category_id(conn, name),
+            rules,
+            payee=payee,
+            memo=memo,
+            csv_category=csv_category,
+        )
+
+
+def suggest_batch(db_path: Path, items: List[Dict[str, Any]]) -> List[Suggestion]:
+    """Suggest categories for many items at once; same heuristics as `suggest`.
+
+    Each item may carry `payee`, `memo` and `csv_category`. Payee rules and
+    internal categories are loaded once up front instead of per item.
+    """
+    if not items:
+        return []
+    rules = _load_payee_rules()
+    with _connect(db_path) as conn:
+        categories = _load_internal_categories(conn)
+    return [
+        _suggest_one(
+            categories.get,
+            rules,
+            payee=it.get("payee"),
+            memo=it.get("memo"),
+            csv_category=it.get("csv_category"),
+        )
+        for it in items
+    ]
+
+
 def extract_csv_category(import_meta_json: Optional[str]) -> Optional[str]:
     """Helper to read csv_category from a transactions.import_meta_json blob."""
     if not import_meta_json:
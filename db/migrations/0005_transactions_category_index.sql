@@ -0,0 +1,6 @@
+-- 0005_transactions_category_index.sql — Serve per-category "latest first" lists from an index
+CREATE INDEX IF NOT EXISTS idx_transactions_category_posted_at
+  ON transactions(category_id, posted_at DESC);
+
+-- Refresh planner statistics for the new index
+ANALYZE transactions;
@@ -0,0 +1,5 @@
+-- 0006_transactions_posted_covering_index.sql — Index-only scans for cleared-balance sums up to a date
+CREATE INDEX IF NOT EXISTS idx_transactions_posted_at_covering
+  ON transactions(posted_at, account_id, is_cleared, amount_cents);
+
+ANALYZE transactions;
@@ -0,0 +1,48 @@
+-- 0007_account_balance_snapshots.sql — Per-account monthly cleared totals kept in step with transactions
+-- month is the 'YYYY-MM' prefix of posted_at; cleared_cents is the sum of cleared amounts posted in that month.
+CREATE TABLE IF NOT EXISTS account_balance_snapshots (
+  account_id INTEGER NOT NULL,
+  month TEXT NOT NULL,
+  cleared_cents INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (account_id, month)
+) WITHOUT ROWID;
+
+-- Backfill from existing ledger
+INSERT INTO account_balance_snapshots(account_id, month, cleared_cents)
+SELECT account_id, substr(posted_at, 1, 7), SUM(amount_cents)
+FROM transactions
+WHERE is_cleared = 1
+GROUP BY account_id, substr(posted_at, 1, 7)
+ON CONFLICT(account_id, month) DO UPDATE SET cleared_cents = excluded.cleared_cents;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_snapshot_insert
+AFTER INSERT ON transactions
+WHEN NEW.is_cleared = 1
+BEGIN
+  INSERT INTO account_balance_snapshots(account_id, month, cleared_cents)
+  VALUES (NEW.account_id, substr(NEW.posted_at, 1, 7), NEW.amount_cents)
+  ON CONFLICT(account_id, month) DO UPDATE SET cleared_cents = cleared_cents + excluded.cleared_cents;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_snapshot_delete
+AFTER DELETE ON transactions
+WHEN OLD.is_cleared = 1
+BEGIN
+  UPDATE account_balance_snapshots
+  SET cleared_cents = cleared_cents - OLD.amount_cents
+  WHERE account_id = OLD.account_id AND month = substr(OLD.posted_at, 1, 7);
+END;
+
+-- Fires for ingestion upserts (ON CONFLICT DO UPDATE) as well as plain updates
+CREATE TRIGGER IF NOT EXISTS trg_transactions_snapshot_update
+AFTER UPDATE OF account_id, posted_at, amount_cents, is_cleared ON transactions
+WHEN OLD.is_cleared = 1 OR NEW.is_cleared = 1
+BEGIN
+  UPDATE account_balance_snapshots
+  SET cleared_cents = cleared_cents - OLD.amount_cents
+  WHERE OLD.is_cleared = 1 AND account_id = OLD.account_id AND month = substr(OLD.posted_at, 1, 7);
+  INSERT INTO account_balance_snapshots(account_id, month, cleared_cents)
+  SELECT NEW.account_id, substr(NEW.posted_at, 1, 7), NEW.amount_cents
+  WHERE NEW.is_cleared = 1
+  ON CONFLICT(account_id, month) DO UPDATE SET cleared_cents = cleared_cents + excluded.cleared_cents;
+END;
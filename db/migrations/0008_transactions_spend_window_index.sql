@@ -0,0 +1,7 @@
+-- 0008_transactions_spend_window_index.sql — Index-only scans for the blended-stats daily spend window
+-- Partial on outflows: the stats query only ever reads amount_cents < 0.
+CREATE INDEX IF NOT EXISTS idx_transactions_outflow_posted_at
+  ON transactions(posted_at, category_id, amount_cents)
+  WHERE amount_cents < 0;
+
+ANALYZE transactions;
@@ -0,0 +1,4 @@
+-- 0009_key_spend_events_event_date_index.sql — Range scans for the key-events list date filter
+-- The rowid (id) is implicit in the index, so ORDER BY event_date, id needs no sort.
+CREATE INDEX IF NOT EXISTS idx_key_spend_events_event_date
+  ON key_spend_events(event_date);
@@ -0,0 +1,4 @@
+-- 0010_transactions_posted_at_idem_index.sql — Index-ordered paging for the transactions list
+-- Matches ORDER BY posted_at DESC, idempotency_key DESC, so a page is read straight off the index.
+CREATE INDEX IF NOT EXISTS idx_transactions_posted_at_idem
+  ON transactions(posted_at DESC, idempotency_key DESC);
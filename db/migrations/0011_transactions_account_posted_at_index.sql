@@ -0,0 +1,7 @@
+-- 0011_transactions_account_posted_at_index.sql — Per-account range seeks for the transactions list
+-- With an account filter plus a date range the planner seeks each account's slice
+-- instead of walking every account's rows in the posted_at index.
+CREATE INDEX IF NOT EXISTS idx_transactions_account_posted_at
+  ON transactions(account_id, posted_at DESC, idempotency_key DESC);
+
+ANALYZE transactions;
@@ -0,0 +1,32 @@
+-- 0012_transactions_fts.sql — Trigram full-text index over payee/memo for the transactions search box
+-- External-content table: text lives in transactions, the index is kept in step by triggers.
+-- The trigram tokenizer matches any substring of 3+ characters case-insensitively, like LIKE '%q%'.
+-- transactions has no INTEGER PRIMARY KEY, so VACUUM may renumber the rowid this index is keyed on:
+-- after VACUUM or other table maintenance run INSERT INTO transactions_fts(transactions_fts) VALUES('rebuild').
+CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5(
+  payee, memo,
+  content='transactions', content_rowid='rowid',
+  tokenize='trigram'
+);
+
+-- Backfill from existing ledger
+INSERT INTO transactions_fts(transactions_fts) VALUES ('rebuild');
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_insert
+AFTER INSERT ON transactions
+BEGIN
+  INSERT INTO transactions_fts(rowid, payee, memo) VALUES (NEW.rowid, NEW.payee, NEW.memo);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_delete
+AFTER DELETE ON transactions
+BEGIN
+  INSERT INTO transactions_fts(transactions_fts, rowid, payee, memo) VALUES ('delete', OLD.rowid, OLD.payee, OLD.memo);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_transactions_fts_update
+AFTER UPDATE OF payee, memo ON transactions
+BEGIN
+  INSERT INTO transactions_fts(transactions_fts, rowid, payee, memo) VALUES ('delete', OLD.rowid, OLD.payee, OLD.memo);
+  INSERT INTO transactions_fts(rowid, payee, memo) VALUES (NEW.rowid, NEW.payee, NEW.memo);
+END;
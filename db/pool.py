@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+
+
+# Applied once to every pooled connection when it is opened.
+# WAL lets readers proceed while a writer commits; the remaining settings keep
+# temp structures and hot pages in memory for the small read queries we serve.
+_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA mmap_size=268435456",
+)
+
+# journal_mode is stored in the DB file, so it only needs setting once per path
+_WAL_PATHS: set[str] = set()
+_WAL_LOCK = threading.Lock()
+
+
+def apply_pragmas(conn: sqlite3.Connection, db_path: Path) -> None:
+    """Apply the pool's PRAGMAs to a connection opened outside the pool."""
+    key = str(db_path)
+    if key not in _WAL_PATHS:
+        with _WAL_LOCK:
+            if key not in _WAL_PATHS:
+                conn.execute("PRAGMA journal_mode=WAL")
+                _WAL_PATHS.add(key)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+
+
+def db_state_stamp(db_path: Path) -> tuple:
+    """mtime/size of the DB file and its WAL; changes whenever a write commits.
+
+    Writes land in the WAL first under pooled WAL connections. A missing and an
+    empty WAL are the same state, so opening a connection (which creates an
+    empty WAL) does not change the stamp. Use it in cache keys for results
+    derived from the DB.
+    """
+    stamp: list = []
+    for f in (db_path, Path(f"{db_path}-wal")):
+        try:
+            st = os.stat(f)
+        except OSError:
+            st = None
+        stamp.extend((st.st_mtime_ns, st.st_size) if st and st.st_size else (None, None))
+    return tuple(stamp)
+
+
+DEFAULT_POOL_SIZE = 8
+
+T = TypeVar("T")
+
+
+class ConnectionPool:
+    """Small queue-backed pool of long-lived SQLite connections for one DB file.
+
+    Connections are opened lazily with `check_same_thread=False` so they can be
+    handed between FastAPI's worker threads. At most `size` idle connections
+    are retained; extra connections opened under load are closed on release.
+    """
+
+    def __init__(self, db_path: Path, size: int = DEFAULT_POOL_SIZE) -> None:
+        self.db_path = Path(db_path)
+        self.size = size
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=size)
+        # SQLite serializes writers anyway; taking the lock up front avoids
+        # burning the busy timeout when two requests write at once.
+        self.write_lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        apply_pragmas(conn, self.db_path)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                # Lets SQLite refresh planner stats for the queries this connection ran
+                conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            conn.close()
+
+
+_POOLS: dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path: Path) -> ConnectionPool:
+    """Return the process-wide pool for `db_path`, creating it on first use."""
+    key = str(db_path)
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = ConnectionPool(Path(db_path))
+                _POOLS[key] = pool
+    return pool
+
+
+@contextmanager
+def connect(db_path: Path, *, write: bool = False) -> Iterator[sqlite3.Connection]:
+    """Borrow a pooled connection for the duration of a `with` block.
+
+    Mirrors `with sqlite3.connect(...) as conn:` semantics: the transaction is
+    committed on success and rolled back on error. Pass `write=True` for
+    handlers that modify the DB so writers queue on the pool's lock.
+    """
+    pool = get_pool(db_path)
+    conn = pool.acquire()
+    try:
+        if write:
+            with pool.write_lock, conn:
+                yield conn
+        else:
+            with conn:
+                yield conn
+    finally:
+        pool.release(conn)
+
+
+async def run(db_path: Path, fn: Callable[[sqlite3.Connection], T], *, write: bool = False) -> T:
+    """Run `fn(conn)` on a pooled connection in the worker threadpool.
+
+    For `async def` handlers: the query and its commit happen off the event
+    loop, so the loop keeps serving other requests during disk waits.
+    """
+
+    def _call() -> T:
+        with connect(db_path, write=write) as conn:
+            return fn(conn)
+
+    return await run_in_threadpool(_call)
+
+
+def close_all() -> None:
+    """Close every idle pooled connection (used on shutdown and in tests)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    with _WAL_LOCK:
+        _WAL_PATHS.clear()
+    for pool in pools:
+        pool.close()
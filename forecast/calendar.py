@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import json
 import os
+import re
 import sqlite3
-from dataclasses import dataclass
-from datetime import date, timedelta
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Iterable, List, Literal, Optional, Tuple, Set
+from zoneinfo import ZoneInfo
+
+from db import pool as db_pool
 
 
 ShiftPolicy = Literal["AS_SCHEDULED", "PREV_BUSINESS_DAY", "NEXT_BUSINESS_DAY"]
@@ -20,6 +26,8 @@ class Entry:
     source_id: int
     shift_applied: bool
     policy: Optional[ShiftPolicy]
+    # Key events only: days before the event that its lead window opens
+    lead_time_days: Optional[int] = field(default=None, compare=False)
 
 
 def _default_db_path() -> Path:
@@ -30,6 +38,38 @@ def _default_db_path() -> Path:
     return Path("localdb/budget.db")
 
 
+def tz_name() -> str:
+    return os.getenv("SCHED_TZ") or os.getenv("TZ") or "UTC"
+
+
+@lru_cache(maxsize=8)
+def _zoneinfo(name: str) -> Optional[ZoneInfo]:
+    # Unknown/invalid names fall back to UTC in today_tz
+    try:
+        return ZoneInfo(name)
+    except Exception:
+        return None
+
+
+def today_tz() -> date:
+    """Today's date in the scheduler timezone (SCHED_TZ, then TZ, else UTC)."""
+    tz = _zoneinfo(tz_name())
+    if tz is None:
+        return datetime.utcnow().date()
+    return datetime.now(tz).date()
+
+
+# One comma-separated token that int() accepts; other tokens are skipped
+_ACCOUNT_ID_RE = re.compile(r"(?:^|,)\s*([+-]?\d+)\s*(?=,|$)")
+
+
+def parse_account_ids(val: str | None) -> set[int] | None:
+    """Parse an `accounts=1,2,3` query value; None when empty or nothing parses."""
+    if not val:
+        return None
+    return {int(m) for m in _ACCOUNT_ID_RE.findall(val)} or None
+
+
 def _is_weekend(d: date) -> bool:
     # Monday = 0 .. Sunday = 6
     return d.weekday() >= 5
@@ -125,118 +165,132 @@ def _recur_dates(start_from: date, end: date, rule: str) -> Iterable[date]:
         yield d
 
 
-def _connect(db_path: Path) -> sqlite3.Connection:
-    db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+# `col IN {_IN_JSON_IDS}` with one bound `_json_id_list(ids)` parameter
+_IN_JSON_IDS = "(SELECT value FROM json_each(?))"
 
 
-def expand_calendar(start: date, end: date, *, db_path: Optional[Path] = None, accounts: Optional[Set[int]] = None) -> List[Entry]:
+def _json_id_list(ids: Iterable[int]) -> str:
+    """Encode integer ids as one JSON array parameter for `_IN_JSON_IDS`."""
+    return json.dumps([int(x) for x in ids])
+
+
+def expand_calendar(
+    start: date,
+    end: date,
+    *,
+    db_path: Optional[Path] = None,
+    accounts: Optional[Set[int]] = None,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Entry]:
     """Expand known scheduled items to dated entries between start and end (inclusive).
 
     Sources:
     - scheduled_inflows: default shift policy = NEXT_BUSINESS_DAY
     - commitments: default shift policy = PREV_BUSINESS_DAY; respects flexible_window_days when shifting earlier
     - key_spend_events: respects per-row shift_policy; defaults to AS_SCHEDULED
+
+    Pass `conn` to reuse a caller's open connection; otherwise one is borrowed from the pool for `db_path`.
     """
     if end < start:
         return []
 
-    dbp = db_path or _default_db_path()
+    if conn is None:
+        with db_pool.connect(db_path or _default_db_path()) as own_conn:
+            return expand_calendar(start, end, accounts=accounts, conn=own_conn)
+
     entries: list[Entry] = []
 
-    with _connect(dbp) as conn:
-        # Inflows
-        inflow_sql = "SELECT id, name, amount_cents, due_rule, next_due_date FROM scheduled_inflows"
-        if accounts:
-            ids = ",".join(str(int(a)) for a in sorted(accounts))
-            inflow_sql += f" WHERE account_id IN ({ids})"
-        for row in conn.execute(inflow_sql):
-            if not row["next_due_date"]:
-                continue
-            start_from = date.fromisoformat(row["next_due_date"])  # seed
-            for due in _recur_dates(max(start, start_from), end, row["due_rule"] or "ONE_OFF"):
-                scheduled = due
-                shifted_date, shifted, used = _apply_shift(scheduled, "NEXT_BUSINESS_DAY")
-                entries.append(
-                    Entry(
-                        date=shifted_date,
-                        type="inflow",
-                        name=row["name"],
-                        amount_cents=int(row["amount_cents"]),
-                        source_id=int(row["id"]),
-                        shift_applied=shifted,
-                        policy=used,
-                    )
+    # Inflows
+    # Account filters bind one JSON array so the SQL text (and its cached plan) is the same for any set size
+    acc_param: tuple = (_json_id_list(accounts),) if accounts else ()
+    inflow_sql = "SELECT id, name, amount_cents, due_rule, next_due_date FROM scheduled_inflows"
+    if accounts:
+        inflow_sql += f" WHERE account_id IN {_IN_JSON_IDS}"
+    for row in conn.execute(inflow_sql, acc_param):
+        if not row["next_due_date"]:
+            continue
+        start_from = date.fromisoformat(row["next_due_date"])  # seed
+        for due in _recur_dates(max(start, start_from), end, row["due_rule"] or "ONE_OFF"):
+            scheduled = due
+            shifted_date, shifted, used = _apply_shift(scheduled, "NEXT_BUSINESS_DAY")
+            entries.append(
+                Entry(
+                    date=shifted_date,
+                    type="inflow",
+                    name=row["name"],
+                    amount_cents=int(row["amount_cents"]),
+                    source_id=int(row["id"]),
+                    shift_applied=shifted,
+                    policy=used,
                 )
+            )
 
-        # Commitments
-        commit_sql = (
-            "SELECT id, name, amount_cents, due_rule, next_due_date, flexible_window_days, account_id FROM commitments"
-        )
-        if accounts:
-            ids = ",".join(str(int(a)) for a in sorted(accounts))
-            commit_sql += f" WHERE account_id IN ({ids})"
-        for row in conn.execute(commit_sql):
-            if not row["next_due_date"]:
-                continue
-            start_from = date.fromisoformat(row["next_due_date"])  # seed
-            window = row["flexible_window_days"]
-            window_int = int(window) if window is not None else None
-            for due in _recur_dates(max(start, start_from), end, row["due_rule"] or "ONE_OFF"):
-                scheduled = due
-                shifted_date, shifted, used = _apply_shift(scheduled, "PREV_BUSINESS_DAY", window_days=window_int)
-                entries.append(
-                    Entry(
-                        date=shifted_date,
-                        type="commitment",
-                        name=row["name"],
-                        amount_cents=-abs(int(row["amount_cents"])),
-                        source_id=int(row["id"]),
-                        shift_applied=shifted,
-                        policy=used,
-                    )
+    # Commitments
+    commit_sql = (
+        "SELECT id, name, amount_cents, due_rule, next_due_date, flexible_window_days, account_id FROM commitments"
+    )
+    if accounts:
+        commit_sql += f" WHERE account_id IN {_IN_JSON_IDS}"
+    for row in conn.execute(commit_sql, acc_param):
+        if not row["next_due_date"]:
+            continue
+        start_from = date.fromisoformat(row["next_due_date"])  # seed
+        window = row["flexible_window_days"]
+        window_int = int(window) if window is not None else None
+        for due in _recur_dates(max(start, start_from), end, row["due_rule"] or "ONE_OFF"):
+            scheduled = due
+            shifted_date, shifted, used = _apply_shift(scheduled, "PREV_BUSINESS_DAY", window_days=window_int)
+            entries.append(
+                Entry(
+                    date=shifted_date,
+                    type="commitment",
+                    name=row["name"],
+                    amount_cents=-abs(int(row["amount_cents"])),
+                    source_id=int(row["id"]),
+                    shift_applied=shifted,
+                    policy=used,
                 )
-
-        # Key spend events
-        key_sql = (
-            "SELECT id, name, event_date, repeat_rule, planned_amount_cents, shift_policy, account_id FROM key_spend_events"
-        )
-        # Filter: include events with NULL account_id (global) or in selected accounts
-        if accounts:
-            key_sql += " WHERE (account_id IS NULL OR account_id IN ({}))".format(
-                ",".join([str(int(a)) for a in sorted(accounts)])
             )
-        for row in conn.execute(key_sql):
-            if not row["event_date"]:
-                continue
-            start_from = date.fromisoformat(row["event_date"])  # seed
-            policy: ShiftPolicy | None
-            if row["shift_policy"]:
-                p = str(row["shift_policy"]).strip().upper()
-                if p in ("AS_SCHEDULED", "PREV_BUSINESS_DAY", "NEXT_BUSINESS_DAY"):
-                    policy = p  # type: ignore
-                else:
-                    policy = "AS_SCHEDULED"
+
+    # Key spend events
+    key_sql = (
+        "SELECT id, name, event_date, repeat_rule, planned_amount_cents, shift_policy, account_id, lead_time_days "
+        "FROM key_spend_events"
+    )
+    # Filter: include events with NULL account_id (global) or in selected accounts
+    if accounts:
+        key_sql += f" WHERE (account_id IS NULL OR account_id IN {_IN_JSON_IDS})"
+    for row in conn.execute(key_sql, acc_param):
+        if not row["event_date"]:
+            continue
+        start_from = date.fromisoformat(row["event_date"])  # seed
+        policy: ShiftPolicy | None
+        if row["shift_policy"]:
+            p = str(row["shift_policy"]).strip().upper()
+            if p in ("AS_SCHEDULED", "PREV_BUSINESS_DAY", "NEXT_BUSINESS_DAY"):
+                policy = p  # type: ignore
             else:
                 policy = "AS_SCHEDULED"
-            amount = int(row["planned_amount_cents"]) if row["planned_amount_cents"] is not None else 0
-            for due in _recur_dates(max(start, start_from), end, row["repeat_rule"] or "ONE_OFF"):
-                scheduled = due
-                shifted_date, shifted, used = _apply_shift(scheduled, policy)
-                entries.append(
-                    Entry(
-                        date=shifted_date,
-                        type="key_event",
-                        name=row["name"],
-                        # Semantics: positive planned amount = cost (subtract); negative = income (add)
-                        amount_cents=-amount,
-                        source_id=int(row["id"]),
-                        shift_applied=shifted,
-                        policy=used,
-                    )
+        else:
+            policy = "AS_SCHEDULED"
+        amount = int(row["planned_amount_cents"]) if row["planned_amount_cents"] is not None else 0
+        lead_days = int(row["lead_time_days"]) if row["lead_time_days"] is not None else None
+        for due in _recur_dates(max(start, start_from), end, row["repeat_rule"] or "ONE_OFF"):
+            scheduled = due
+            shifted_date, shifted, used = _apply_shift(scheduled, policy)
+            entries.append(
+                Entry(
+                    date=shifted_date,
+                    type="key_event",
+                    name=row["name"],
+                    # Semantics: positive planned amount = cost (subtract); negative = income (add)
+                    amount_cents=-amount,
+                    source_id=int(row["id"]),
+                    shift_applied=shifted,
+                    policy=used,
+                    lead_time_days=lead_days,
                 )
+            )
 
     # Deterministic ordering: by date, then type, then source_id for stability
     entries.sort(key=lambda e: (e.date, e.type, e.source_id))
@@ -247,7 +301,7 @@ def compute_balances(opening_balance_cents: int, entries: Iterable[Entry]) -> di
     """Compute daily balances over the dates present in `entries`.
 
     - Inflows add to balance; commitments and key events subtract.
-    - Returns mapping of date -> end-of-day balance for that date.
+    - Returns mapping of date -> end-of-day balance for that date, in ascending date order.
     - Deterministic given same input sequence; sorts by date then type/source_id internally.
     """
     items = sorted(entries, key=lambda e: (e.date, e.type, e.source_id))
@@ -276,3 +330,13 @@ def compute_balances(opening_balance_cents: int, entries: Iterable[Entry]) -> di
         running = flush_day(current_day, delta_for_day, running)
 
     return balances
+
+
+def min_balance(balances: dict[date, int]) -> tuple[Optional[int], Optional[date]]:
+    """Lowest balance and its date in one pass; ties go to the earliest date."""
+    min_bal: Optional[int] = None
+    min_date: Optional[date] = None
+    for d, bal in balances.items():
+        if min_bal is None or bal < min_bal or (bal == min_bal and d < min_date):
+            min_bal, min_date = bal, d
+    return min_bal, min_date
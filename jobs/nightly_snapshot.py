@@ -14,6 +14,9 @@ from forecast.calendar import (
     compute_balances,
     expand_calendar,
     _default_db_path,
+    min_balance,
+    today_tz,
+    tz_name,
 )
 from api.forecast import compute_opening_balance_cents
 try:
@@ -24,21 +27,6 @@ except Exception:  # pragma: no cover
 logger = logging.getLogger("uvicorn.error")
 
 
-def _tz_name() -> str:
-    return os.getenv("SCHED_TZ") or os.getenv("TZ") or "UTC"
-
-
-def _today_tz() -> date:
-    try:
-        # Use zoneinfo if available (Python 3.9+)
-        from zoneinfo import ZoneInfo  # type: ignore
-
-        tz = ZoneInfo(_tz_name())
-        return datetime.now(tz).date()
-    except Exception:
-        return datetime.utcnow().date()
-
-
 def _connect(db_path: Path) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(db_path)
@@ -84,21 +72,15 @@ def _compute_digest(
     # Next cliff: earliest date with balance below threshold
     next_cliff_date = None
     next_cliff_balance = None
-    for d in sorted(balances.keys()):
-        if d >= today and balances[d] < threshold:
+    # compute_balances yields dates in ascending order
+    for d, b in balances.items():
+        if d >= today and b < threshold:
             next_cliff_date = d
-            next_cliff_balance = balances[d]
+            next_cliff_balance = b
             break
 
     # Min balance/date across horizon
-    min_balance_cents = None
-    min_balance_date = None
-    if balances:
-        for d in sorted(balances.keys()):
-            b = balances[d]
-            if min_balance_cents is None or b < min_balance_cents:
-                min_balance_cents = b
-                min_balance_date = d
+    min_balance_cents, min_balance_date = min_balance(balances)
 
     # Top commitments in next 14 days
     window_end = today + timedelta(days=14)
@@ -163,7 +145,7 @@ def _compute_digest(
         "meta": {
             "opening_balance_strategy": "sum_cleared_active_accounts_as_of(start_minus_one)",
             "db_path": str(db_path),
-            "tz": _tz_name(),
+            "tz": tz_name(),
         },
     }
 
@@ -174,7 +156,7 @@ def run_nightly_snapshot(horizon_days: int = 120, *, db_path: Optional[Path] = N
     Returns the computed digest payload for convenience.
     """
     dbp = db_path or _default_db_path()
-    today = _today_tz()
+    today = today_tz()
     start = today
     end = start + timedelta(days=horizon_days)
 
@@ -209,13 +191,7 @@ def run_nightly_snapshot(horizon_days: int = 120, *, db_path: Optional[Path] = N
     }
 
     # Min balance/date
-    min_balance_cents = None
-    min_balance_date = None
-    for d in sorted(balances.keys()):
-        b = balances[d]
-        if min_balance_cents is None or b < min_balance_cents:
-            min_balance_cents = b
-            min_balance_date = d
+    min_balance_cents, min_balance_date = min_balance(balances)
 
     # Persist snapshot row
     created_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
@@ -142,17 +142,23 @@ def _score_match(raw: str, pattern: str, match_type: str) -> float:
     return 0.0
 
 
-def match_payee(raw_payee: str, threshold: float = 0.6) -> Optional[Dict[str, Any]]:
+def load_rules() -> List[sqlite3.Row]:
+    """Fetch every payee rule once, for callers matching many payees in a row."""
     init_db()
     conn = _conn()
-    c = conn.cursor()
-    c.execute("SELECT * FROM payee_rules")
+    try:
+        return conn.execute("SELECT * FROM payee_rules").fetchall()
+    finally:
+        conn.close()
+
+
+def match_payee_in(raw_payee: str, rules: List[sqlite3.Row], threshold: float = 0.6) -> Optional[Dict[str, Any]]:
+    """Like match_payee, but scores against an already-loaded rule list."""
     best: Tuple[float, Optional[sqlite3.Row]] = (0.0, None)
-    for row in c.fetchall():
+    for row in rules:
         score = _score_match(raw_payee, row["pattern"], row["match_type"]) * float(row["confidence"] or 0.8)
         if score > best[0]:
             best = (score, row)
-    conn.close()
     if best[1] is None or best[0] < threshold:
         return None
     row = best[1]
@@ -167,6 +173,10 @@ def match_payee(raw_payee: str, threshold: float = 0.6) -> Optional[Dict[str, An
     }
 
 
+def match_payee(raw_payee: str, threshold: float = 0.6) -> Optional[Dict[str, Any]]:
+    return match_payee_in(raw_payee, load_rules(), threshold=threshold)
+
+
 def record_local_transaction(
     *,
     ynab_tx_id: Optional[str],
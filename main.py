@@ -19,6 +19,7 @@ import hmac
 from datetime import datetime
 from dotenv import load_dotenv
 from db.migrate import run_migrations
+from db.pool import close_all as close_db_pools
 # Avoid repopulating .env during tests that monkeypatch env vars
 try:
     if 'PYTEST_CURRENT_TEST' not in os.environ:
@@ -353,6 +354,15 @@ def compute_latest_digest():
         logger.exception(f"[DIGEST] Failed computing digest from snapshot: {e}")
         return None
 
+def _prewarm_ledger() -> None:
+    try:
+        from api.transactions import prewarm_transactions
+
+        prewarm_transactions(SOT_DB_PATH)
+    except Exception as e:
+        logger.exception(f"[INIT] Ledger prewarm failed: {e}")
+
+
 @app.on_event("startup")
 async def startup():
     # Attach logging redaction filter to common loggers
@@ -371,6 +381,10 @@ async def startup():
             logger.info("[MIGRATIONS] No pending migrations")
     except Exception as e:
         logger.exception(f"[MIGRATIONS] Failed to run migrations: {e}")
+    else:
+        # Warm the migrated ledger in a worker thread so startup is not held up by the scan
+        if transactions_router is not None:
+            app.state.prewarm_task = asyncio.create_task(asyncio.to_thread(_prewarm_ledger))
 
     # Initialize chat history DB used by the app
     init_db()
@@ -392,6 +406,8 @@ async def startup():
 
 @app.on_event("shutdown")
 async def shutdown():
+    # Release pooled SQLite connections held by the API routers
+    close_db_pools()
     # Gracefully stop scheduler task if running
     task = getattr(app.state, "daily_task", None)
     if task and not task.done():
@@ -1,24 +1,19 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
 from q import queries as Q
 from api.forecast import compute_opening_balance_cents  # reuse opening balance helper
+from forecast.calendar import today_tz
 
 
 # ---- Period helpers ----
 
 def _today() -> date:
-    try:
-        from zoneinfo import ZoneInfo  # type: ignore
-        import os
-
-        tz = ZoneInfo(os.getenv("SCHED_TZ") or os.getenv("TZ") or "UTC")
-        return datetime.now(tz).date()
-    except Exception:
-        return datetime.utcnow().date()
+    # Same scheduler-timezone "today" the export cache keys on
+    return today_tz()
 
 
 def last_full_months(n: int, *, today: Optional[date] = None) -> Tuple[date, date]:
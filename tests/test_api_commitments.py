@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import importlib
+import os
+import sqlite3
+import sys
+from fractions import Fraction
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def load_app():
+    if 'main' in sys.modules:
+        importlib.reload(sys.modules['main'])
+    else:
+        import main  # noqa: F401
+    return sys.modules['main'].app
+
+
+_AMOUNTS = [0, 1, 3, 6, 18, 999, 12345, -4507, 100003]
+
+# Monthly equivalent per rule for each of _AMOUNTS: amount * factor, rounded half away from zero.
+# Rules match case-insensitively; unknown rules count as monthly.
+_EXPECTED_MONTHLY = {
+    "MONTHLY": [0, 1, 3, 6, 18, 999, 12345, -4507, 100003],
+    "weekly": [0, 4, 13, 26, 78, 4329, 53495, -19530, 433346],
+    "BIWEEKLY": [0, 2, 7, 13, 39, 2165, 26748, -9765, 216673],
+    "ANNUAL": [0, 0, 0, 1, 2, 83, 1029, -376, 8334],
+    "YEARLY": [0, 0, 0, 1, 2, 83, 1029, -376, 8334],
+    "MONTHLY_BY_DATE": [0, 1, 3, 6, 18, 999, 12345, -4507, 100003],
+    "QUARTERLY": [0, 1, 3, 6, 18, 999, 12345, -4507, 100003],
+}
+
+
+# Exact months-per-period ratios, independent of the SQL's own factor table
+_EXACT_FACTORS = {
+    "MONTHLY": Fraction(1),
+    "MONTHLY_BY_DATE": Fraction(1),
+    "WEEKLY": Fraction(52, 12),
+    "BIWEEKLY": Fraction(26, 12),
+    "ANNUAL": Fraction(1, 12),
+    "YEARLY": Fraction(1, 12),
+}
+
+
+def _exact_monthly(amount_cents: int, due_rule: str) -> int:
+    """amount * factor on exact fractions, rounded half away from zero."""
+    x = amount_cents * _EXACT_FACTORS.get(due_rule.upper(), Fraction(1))
+    n = int(abs(x) + Fraction(1, 2))
+    return n if x >= 0 else -n
+
+
+def test_expected_monthly_literals_round_exact_fractions():
+    for rule, values in _EXPECTED_MONTHLY.items():
+        assert values == [_exact_monthly(a, rule) for a in _AMOUNTS], rule
+
+
+def _init_test_db(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS accounts (
+              id INTEGER PRIMARY KEY,
+              name TEXT NOT NULL,
+              type TEXT NOT NULL,
+              currency TEXT NOT NULL,
+              is_active INTEGER NOT NULL DEFAULT 1
+            );
+            INSERT INTO accounts(id, name, type, currency) VALUES (1, 'Current', 'current', 'EUR');
+            CREATE TABLE IF NOT EXISTS commitments (
+              id INTEGER PRIMARY KEY,
+              name TEXT NOT NULL,
+              amount_cents INTEGER NOT NULL,
+              due_rule TEXT NOT NULL,
+              next_due_date TEXT,
+              priority INTEGER,
+              account_id INTEGER,
+              flexible_window_days INTEGER,
+              category_id INTEGER,
+              type TEXT
+            );
+            """
+        )
+        rows = []
+        for i, amt in enumerate(_AMOUNTS):
+            for rule in _EXPECTED_MONTHLY:
+                rows.append((f"c{i}-{rule}", amt, rule))
+        conn.executemany(
+            "INSERT INTO commitments(name, amount_cents, due_rule, priority, account_id, flexible_window_days, type) VALUES(?,?,?,1,1,0,'bill')",
+            rows,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_list_commitments_monthly_equivalents_and_totals(tmp_path):
+    db_path = tmp_path / "commitments.db"
+    _init_test_db(db_path)
+    os.environ["BUDGET_DB_PATH"] = str(db_path)
+    app = load_app()
+    client = TestClient(app)
+
+    resp = client.get("/api/commitments")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["count"] == 63
+    for item in data["items"]:
+        expected = _EXPECTED_MONTHLY[item["due_rule"]][_AMOUNTS.index(item["amount_cents"])]
+        assert item["monthly_equivalent_cents"] == expected
+    assert data["total_cents"] == sum(i["amount_cents"] for i in data["items"])
+    assert data["monthly_equivalent_cents"] == sum(i["monthly_equivalent_cents"] for i in data["items"])
+
+
+def test_list_commitments_monthly_equivalents_round_ties_away_from_zero(tmp_path):
+    db_path = tmp_path / "commitments_ties.db"
+    _init_test_db(db_path)
+    # Every residue mod 12 on both signs, plus large amounts whose quotient is an exact .5 tie
+    amounts = list(range(-36, 37)) + [12345, -12345, 100006, 2999994]
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("DELETE FROM commitments")
+        conn.executemany(
+            "INSERT INTO commitments(name, amount_cents, due_rule, priority, account_id, flexible_window_days, type) VALUES(?,?,?,1,1,0,'bill')",
+            [(f"t{a}-{rule}", a, rule) for a in amounts for rule in _EXACT_FACTORS],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    os.environ["BUDGET_DB_PATH"] = str(db_path)
+    client = TestClient(load_app())
+
+    data = client.get("/api/commitments").json()
+    assert data["count"] == len(amounts) * len(_EXACT_FACTORS)
+    for item in data["items"]:
+        assert item["monthly_equivalent_cents"] == _exact_monthly(item["amount_cents"], item["due_rule"]), item
+
+
+def test_list_commitments_summary_only_matches_full_totals(tmp_path):
+    db_path = tmp_path / "commitments_summary.db"
+    _init_test_db(db_path)
+    os.environ["BUDGET_DB_PATH"] = str(db_path)
+    app = load_app()
+    client = TestClient(app)
+
+    full = client.get("/api/commitments").json()
+    summary = client.get("/api/commitments", params={"summary_only": 1}).json()
+    assert summary == {
+        "count": full["count"],
+        "total_cents": full["total_cents"],
+        "monthly_equivalent_cents": full["monthly_equivalent_cents"],
+    }
+
+
+def test_commitment_writes_reject_unknown_account(tmp_path):
+    db_path = tmp_path / "commitments_accounts.db"
+    _init_test_db(db_path)
+    os.environ["BUDGET_DB_PATH"] = str(db_path)
+    app = load_app()
+    client = TestClient(app)
+
+    r = client.post("/api/commitments", json={"name": "Gym", "amount_cents": 3000, "account_id": 99})
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Account not found"
+    assert client.get("/api/commitments", params={"summary_only": 1}).json()["count"] == 63
+
+    r = client.post("/api/commitments", json={"name": "Gym", "amount_cents": 3000, "account_id": 1})
+    assert r.status_code == 200
+    cid = r.json()["commitment"]["id"]
+
+    r = client.put(f"/api/commitments/{cid}", json={"account_id": 99, "priority": 5})
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Account not found"
+    r = client.put("/api/commitments/999999", json={"account_id": 1})
+    assert r.status_code == 404
+    assert r.json()["detail"] == "Commitment not found"
+
+    r = client.put(f"/api/commitments/{cid}", json={"priority": 5})
+    assert r.json()["commitment"]["priority"] == 5
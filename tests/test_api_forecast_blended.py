@@ -177,3 +177,148 @@ def test_api_forecast_blended_with_params(tmp_path, monkeypatch):
     assert lower["2025-01-03"] == 4900 - 40
     assert upper["2025-01-03"] == 4900 + 40
 
+
+def test_blended_params_cached_until_db_changes(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta
+
+    from api import forecast as forecast_api
+
+    db_path = tmp_path / "budget_stats_cache.db"
+    _init_test_db(db_path)
+    yesterday = (datetime.utcnow().date() - timedelta(days=1)).isoformat()
+    conn = sqlite3.connect(db_path)
+    try:
+        # Switch journal mode up front, as the app's connections do on first use
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT, parent_id INTEGER)")
+        conn.execute(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, source, is_cleared) VALUES (?,?,?,?,?,?)",
+            ("stats-1", 1, yesterday, -18000, "seed", 1),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    loads = []
+    real_stats = forecast_api.compute_daily_stats
+
+    def _counting_stats(*args, **kwargs):
+        loads.append(args)
+        return real_stats(*args, **kwargs)
+
+    # One stats computation per cache miss
+    monkeypatch.setattr(forecast_api, "compute_daily_stats", _counting_stats)
+
+    _, mu_1, _ = forecast_api._blended_params(db_path, window_days=180)
+    assert mu_1 == 100
+    forecast_api._blended_params(db_path, window_days=180)
+    assert len(loads) == 1
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, source, is_cleared) VALUES (?,?,?,?,?,?)",
+            ("stats-2", 1, yesterday, -18000, "seed", 1),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    # Guard against coarse filesystem timestamps: force a distinct mtime
+    st = os.stat(db_path)
+    os.utime(db_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    _, mu_2, _ = forecast_api._blended_params(db_path, window_days=180)
+    assert mu_2 == 200
+    assert len(loads) == 2
+
+
+def test_daily_spend_aggregation_matches_raw_rows(tmp_path):
+    import random
+    from datetime import datetime, timedelta
+
+    from api import forecast as forecast_api
+    from db import pool as db_pool
+    from forecast.blended_stats import compute_daily_stats, compute_weekday_multipliers
+
+    db_path = tmp_path / "budget_stats_sql.db"
+    _init_test_db(db_path)
+    rng = random.Random(7)
+    today = datetime.utcnow().date()
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT, parent_id INTEGER)")
+        conn.executemany(
+            "INSERT INTO categories(id, name, parent_id) VALUES (?,?,?)",
+            [(1, "Groceries", None), (2, "Internal Transfer", None), (3, "Bills", None), (4, "Rent", 3),
+             (5, "Savings Goals", None), (6, "Pocket money", 5), (7, "INCOME", None)],
+        )
+        rows = []
+        for i in range(600):
+            day = today - timedelta(days=rng.randint(0, 200))
+            posted = day.isoformat() if i % 2 else f"{day.isoformat()}T00:00:00Z"
+            rows.append((f"s-{i}", 1, posted, rng.randint(-9000, 3000), "seed", rng.choice([None, 1, 2, 4, 6, 7])))
+        conn.executemany(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, source, category_id) "
+            "VALUES (?,?,?,?,?,?)",
+            rows,
+        )
+        conn.commit()
+        cutoff = (today - timedelta(days=180)).isoformat()
+        raw = [
+            {"amount_cents": a, "posted_at": p, "category_name": cn, "category_group": cg}
+            for a, p, cn, cg in conn.execute(
+                "SELECT t.amount_cents, t.posted_at, c.name, cg.name FROM transactions t "
+                "LEFT JOIN categories c ON c.id = t.category_id LEFT JOIN categories cg ON cg.id = c.parent_id "
+                "WHERE t.posted_at >= ?",
+                (cutoff,),
+            )
+        ]
+    finally:
+        conn.close()
+
+    try:
+        daily = forecast_api._load_daily_spend_for_stats(db_path, window_days=180)
+        assert len(daily) <= 181
+        assert compute_daily_stats(daily, 180) == compute_daily_stats(raw, 180)
+        assert compute_weekday_multipliers(daily, 180) == compute_weekday_multipliers(raw, 180)
+    finally:
+        db_pool.close_all()
+
+
+def test_monte_carlo_samples_by_default_and_analytic_is_opt_in(tmp_path, monkeypatch):
+    from api import forecast as forecast_api
+
+    db_path = tmp_path / "budget_mc.db"
+    _init_test_db(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO scheduled_inflows(name, amount_cents, due_rule, next_due_date, account_id, type) VALUES (?,?,?,?,?,?)",
+            ("Payday", 100_00, "WEEKLY", "2025-01-04", 1, "payroll"),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+    app = load_app()
+    monkeypatch.setattr(forecast_api, "MONTE_CARLO_ENABLED", True)
+    client = TestClient(app)
+
+    base = {"start": "2025-01-01", "end": "2025-01-10", "mu_daily": 100, "weekday_mult": "[1,1,1,1,1,1,1]"}
+
+    # iterations/seed drive the default (sampled) method
+    resp = client.get("/api/forecast/monte-carlo", params={**base, "sigma_daily": 50, "iterations": 50, "seed": 3})
+    assert resp.status_code == 200
+    params = resp.json()["params"]
+    assert (params["method"], params["iterations"], params["seed"]) == ("sampled", 50, 3)
+
+    # The closed form takes no sampling parameters
+    resp = client.get("/api/forecast/monte-carlo", params={**base, "sigma_daily": 50, "method": "analytic", "seed": 3})
+    assert resp.status_code == 400
+
+    # A negative sigma is treated as its magnitude: P10 stays at or below P90
+    pos = client.get("/api/forecast/monte-carlo", params={**base, "sigma_daily": 50, "method": "analytic"}).json()
+    neg = client.get("/api/forecast/monte-carlo", params={**base, "sigma_daily": -50, "method": "analytic"}).json()
+    assert pos["params"]["iterations"] is None
+    assert neg["bands"]["p10"] and neg["bands"] == pos["bands"]
+    assert all(neg["bands"]["p10"][d] <= neg["bands"]["p90"][d] for d in neg["bands"]["p10"])
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import importlib
+import json
 import os
 import sqlite3
 import sys
@@ -179,3 +180,76 @@ def test_api_forecast_calendar(tmp_path, monkeypatch):
     assert data["min_balance_cents"] == 3000
     assert data["min_balance_date"] == "2025-01-05"
 
+
+    # Column layout carries the same entries as one list per field
+    cols = client.get(
+        "/api/forecast/calendar",
+        params={"start": "2025-01-01", "end": "2025-01-10", "layout": "columns"},
+    ).json()["entries"]
+    rows = data["entries"]
+    assert cols["date"] == [r["date"] for r in rows]
+    assert cols["amount_cents"] == [r["amount_cents"] for r in rows]
+    assert cols["is_within_lead_window"] == [r["is_within_lead_window"] for r in rows]
+    assert rows[0]["date"] == "2025-01-03"
+
+    # Conditional GET: same DB state and params -> 304; a write changes the tag
+    params = {"start": "2025-01-01", "end": "2025-01-10", "buffer_floor": 0}
+    etag = client.get("/api/forecast/calendar", params=params).headers["ETag"]
+    not_modified = client.get("/api/forecast/calendar", params=params, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, source, is_cleared) "
+            "VALUES ('etag-1', 1, '2024-12-30', -100, 'test', 1)"
+        )
+        conn.commit()
+    finally:
+        conn.close()
+    st = os.stat(db_path)
+    os.utime(db_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    changed = client.get("/api/forecast/calendar", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["opening_balance_cents"] == 9900
+
+
+def test_transactions_export_json_and_ndjson(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_test_export.db"
+    _init_test_db(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("CREATE TABLE categories (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        conn.execute("INSERT INTO categories(id, name) VALUES (7, 'Groceries')")
+        conn.executemany(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, payee, source, category_id, is_cleared) "
+            "VALUES (?,?,?,?,?,'seed',?,?)",
+            [
+                ("x-2", 1, "2025-01-02T09:00:00Z", -1200, "Shop", 7, 1),
+                ("x-1", 1, "2025-01-02", -300, "Cafe", None, 1),
+                ("x-3", 1, "2025-01-03", -50, "Pending", None, 0),
+                ("x-4", 1, "2025-01-04", 900, "Late", None, 1),
+            ],
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+    client = TestClient(load_app())
+    params = {"from": "2025-01-02", "end": "2025-01-03"}
+
+    data = client.get("/api/transactions/export", params=params).json()
+    assert data["count"] == 2
+    assert [t["payee"] for t in data["transactions"]] == ["Cafe", "Shop"]
+    assert data["transactions"][1]["category_name"] == "Groceries"
+
+    streamed = client.get("/api/transactions/export", params={**params, "format": "ndjson"})
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    assert lines == data["transactions"]
+
+    bad = client.get("/api/transactions/export", params={**params, "format": "xml"})
+    assert bad.status_code == 400
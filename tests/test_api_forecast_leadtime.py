@@ -136,3 +136,33 @@ def test_lead_window_boundaries(tmp_path, monkeypatch):
     # UI marker present for key events
     assert kv[("Birthday Alice", "2025-01-06")]["ui_marker"] in ("🎂", "🎯", "🎄")
 
+
+
+def test_debug_entries_include_lead_time_days(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_leadtime_debug.db"
+    _init_test_db(db_path)
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO key_spend_events(name, event_date, repeat_rule, planned_amount_cents, lead_time_days, shift_policy, account_id) VALUES (?,?,?,?,?,?,?)",
+            ("Birthday Alice", "2025-01-06", "ONE_OFF", 1000, 5, "AS_SCHEDULED", 1),
+        )
+        conn.execute(
+            "INSERT INTO scheduled_inflows(name, amount_cents, due_rule, next_due_date, account_id, type) VALUES (?,?,?,?,?,?)",
+            ("Payday", 10000, "WEEKLY", "2025-01-03", 1, "payroll"),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    app = load_app()
+    client = TestClient(app)
+
+    resp = client.get("/api/forecast/calendar/debug", params={"start": "2025-01-01", "end": "2025-01-10"})
+    assert resp.status_code == 200
+    lead = {(e["type"], e["name"]): e["lead_time_days"] for e in resp.json()["entries"]}
+    assert lead[("key_event", "Birthday Alice")] == 5
+    assert lead[("inflow", "Payday")] is None
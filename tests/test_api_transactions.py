@@ -0,0 +1,193 @@
+import importlib
+import sqlite3
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from db.migrate import run_migrations
+
+
+def load_app():
+    if 'main' in sys.modules:
+        importlib.reload(sys.modules['main'])
+    else:
+        import main  # noqa: F401
+    return sys.modules['main'].app
+
+
+def _seed(db_path: Path) -> None:
+    run_migrations(db_path)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO accounts(id, name, type, currency, is_active) VALUES (1, 'Checking', 'checking', 'EUR', 1)"
+        )
+        rows = [
+            ("t1", "2024-05-01", -1200, "Corner Grocery", None),
+            ("t2", "2024-05-02", -800, "Cafe", "weekly GROCERIES top-up"),
+            ("t3", "2024-05-03", -500, 'Bob "The Builder"', "nails"),
+            ("t4", "2024-05-04", -300, "Fuel", None),
+        ]
+        conn.executemany(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, payee, memo, source, is_cleared) "
+            "VALUES (?, 1, ?, ?, ?, ?, 'test', 1)",
+            rows,
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _keys(client, q):
+    data = client.get("/api/transactions", params={"q": q}).json()
+    assert data["total"] == data["count"]
+    return sorted(item["idempotency_key"] for item in data["items"])
+
+
+def test_search_uses_fts_with_substring_semantics(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_search.db"
+    _seed(db_path)
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    app = load_app()
+    with TestClient(app) as client:
+        # Case-insensitive substring across payee and memo, as with LIKE '%q%'
+        assert _keys(client, "grocer") == ["t1", "t2"]
+        assert _keys(client, "ocer") == ["t1", "t2"]
+        # FTS syntax in the needle is matched literally
+        assert _keys(client, '"the builder"') == ["t3"]
+        assert _keys(client, "nails OR fuel") == []
+        # Short needles fall back to LIKE
+        assert _keys(client, "fu") == ["t4"]
+
+        # Triggers keep the index in step with edits and deletes
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE transactions SET payee = 'Farm Shop' WHERE idempotency_key = 't1'")
+        conn.execute("DELETE FROM transactions WHERE idempotency_key = 't2'")
+        conn.commit()
+        conn.close()
+        assert _keys(client, "grocer") == []
+        assert _keys(client, "farm") == ["t1"]
+
+
+def test_search_rechecks_fts_matches_against_row_text(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_fts_stale.db"
+    _seed(db_path)
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    # Simulate an index that fell out of step (e.g. rowids renumbered by VACUUM)
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TRIGGER trg_transactions_fts_update")
+    conn.execute("UPDATE transactions SET payee = 'Farm Shop' WHERE idempotency_key = 't1'")
+    conn.commit()
+    conn.close()
+
+    app = load_app()
+    with TestClient(app) as client:
+        # Stale index entries never surface rows whose text no longer matches
+        assert _keys(client, "grocer") == ["t2"]
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO transactions_fts(transactions_fts) VALUES('rebuild')")
+        conn.commit()
+        conn.close()
+        assert _keys(client, "farm") == ["t1"]
+
+
+def test_cursor_pages_match_offset_pages(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_cursor.db"
+    _seed(db_path)
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    app = load_app()
+    with TestClient(app) as client:
+        by_offset = [
+            item["idempotency_key"]
+            for off in (0, 2)
+            for item in client.get("/api/transactions", params={"limit": 2, "offset": off}).json()["items"]
+        ]
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            page = client.get("/api/transactions", params=params).json()
+            assert page["total"] == 4
+            seen.extend(item["idempotency_key"] for item in page["items"])
+            if not page["next_cursor"]:
+                break
+            params = {"limit": 2, "cursor": page["next_cursor"]}
+        assert seen == by_offset == ["t4", "t3", "t2", "t1"]
+
+        assert client.get("/api/transactions", params={"cursor": "%%%"}).status_code == 400
+
+        # Account names are cached per DB state; a rename shows up on the next request
+        first = client.get("/api/transactions", params={"limit": 1}).json()["items"][0]
+        assert first["account"] == {"id": 1, "name": "Checking"}
+        conn = sqlite3.connect(db_path)
+        conn.execute("UPDATE accounts SET name = 'Main' WHERE id = 1")
+        conn.commit()
+        conn.close()
+        first = client.get("/api/transactions", params={"limit": 1}).json()["items"][0]
+        assert first["account"] == {"id": 1, "name": "Main"}
+
+
+def test_rows_without_an_account_are_excluded(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_orphan.db"
+    _seed(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, payee, source, is_cleared) "
+        "VALUES ('orphan', 99, '2024-05-05', -100, 'Ghost', 'test', 1)"
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    app = load_app()
+    with TestClient(app) as client:
+        data = client.get("/api/transactions").json()
+        assert data["total"] == 4
+        assert "orphan" not in [item["idempotency_key"] for item in data["items"]]
+
+
+def test_same_day_mixed_posted_at_formats_order_and_page(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_mixed.db"
+    run_migrations(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO accounts(id, name, type, currency, is_active) VALUES (1, 'Checking', 'checking', 'EUR', 1)"
+    )
+    conn.executemany(
+        "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, payee, source, is_cleared) "
+        "VALUES (?, 1, ?, -100, 'p', 'test', 1)",
+        [
+            ("quick-a", "2024-06-01"),  # quick-add stores a bare date
+            ("csv-b", "2024-06-01T00:00:00Z"),  # CSV import stores a timestamp
+            ("quick-c", "2024-06-01"),
+            ("csv-d", "2024-05-31T00:00:00Z"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    expected = ["csv-b", "quick-c", "quick-a", "csv-d"]
+    app = load_app()
+    with TestClient(app) as client:
+        data = client.get("/api/transactions").json()
+        assert [item["idempotency_key"] for item in data["items"]] == expected
+
+        # Both formats fall inside a one-day range
+        day = client.get("/api/transactions", params={"start": "2024-06-01", "end": "2024-06-01"}).json()
+        assert day["total"] == 3
+
+        seen = []
+        params = {"limit": 1}
+        while True:
+            page = client.get("/api/transactions", params=params).json()
+            seen.extend(item["idempotency_key"] for item in page["items"])
+            if not page["next_cursor"]:
+                break
+            params = {"limit": 1, "cursor": page["next_cursor"]}
+        assert seen == expected
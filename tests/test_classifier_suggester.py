@@ -73,3 +73,31 @@ def test_suggest_uses_payee_rules(tmp_path):
     finally:
         conn.close()
 
+
+
+def test_suggest_batch_matches_single_suggestions(tmp_path):
+    db_path = tmp_path / "budget_classifier_batch.db"
+    _init_db(db_path)
+
+    from localdb import payee_db
+    from classification.suggester import suggest_batch
+
+    payee_db.upsert_rule(
+        pattern="starbucks store",
+        match_type="icontains",
+        suggested_category=None,
+        suggested_subcategory="Coffee",
+        suggested_memo=None,
+        confidence=0.9,
+    )
+
+    items = [
+        {"payee": "STARBUCKS STORE 1234", "memo": None, "csv_category": None},
+        {"payee": "Corner Shop", "memo": "coffee beans", "csv_category": None},
+        {"payee": "Unknown", "memo": None, "csv_category": "Coffee"},
+        {"payee": None, "memo": None, "csv_category": "Nope"},
+    ]
+    batch = suggest_batch(db_path, items)
+    assert batch == [suggest(db_path, **it) for it in items]
+    assert "payee rule" in batch[0].notes
+    assert batch[3].category_id is None
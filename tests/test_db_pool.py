@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from db import pool as db_pool  # noqa: E402
+
+
+def test_pool_reuses_connections_and_enables_wal(tmp_path):
+    db_path = tmp_path / "pool.db"
+    try:
+        with db_pool.connect(db_path, write=True) as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, v TEXT)")
+            conn.execute("INSERT INTO t(v) VALUES ('a')")
+            first = conn
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+        # Committed on exit and visible to an unrelated connection
+        raw = sqlite3.connect(db_path)
+        try:
+            assert raw.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+        finally:
+            raw.close()
+
+        # Same connection handed back out of the pool
+        with db_pool.connect(db_path) as conn:
+            assert conn is first
+            assert conn.execute("SELECT v FROM t").fetchone()["v"] == "a"
+    finally:
+        db_pool.close_all()
+
+
+def test_pool_rolls_back_on_error(tmp_path):
+    db_path = tmp_path / "pool_rollback.db"
+    try:
+        with db_pool.connect(db_path, write=True) as conn:
+            conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY)")
+
+        with pytest.raises(RuntimeError):
+            with db_pool.connect(db_path, write=True) as conn:
+                conn.execute("INSERT INTO t(id) VALUES (1)")
+                raise RuntimeError("boom")
+
+        with db_pool.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    finally:
+        db_pool.close_all()
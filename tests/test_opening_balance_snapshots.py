@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from api.forecast import compute_opening_balance_cents  # noqa: E402
+from db.migrate import run_migrations  # noqa: E402
+
+_MIGRATIONS_DIR = Path(ROOT_DIR) / "db" / "migrations"
+
+
+def _brute_force(conn: sqlite3.Connection, as_of: date) -> int:
+    row = conn.execute(
+        "SELECT COALESCE(SUM(t.amount_cents), 0) FROM transactions t JOIN accounts a ON a.id = t.account_id "
+        "WHERE a.is_active = 1 AND t.is_cleared = 1 AND DATE(t.posted_at) <= ?",
+        (as_of.isoformat(),),
+    ).fetchone()
+    return int(row[0])
+
+
+def test_snapshot_opening_balance_tracks_ledger_writes(tmp_path):
+    db_path = tmp_path / "snapshots.db"
+    run_migrations(db_path, _MIGRATIONS_DIR)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        conn.execute("INSERT INTO accounts(id, name, type, currency, is_active) VALUES (1, 'Current', 'checking', 'EUR', 1)")
+        conn.execute("INSERT INTO accounts(id, name, type, currency, is_active) VALUES (2, 'Old', 'checking', 'EUR', 0)")
+        rows = [
+            ("a", 1, "2025-01-15", 10000, 1),
+            ("b", 1, "2025-02-01T00:00:00Z", -2500, 1),
+            ("c", 1, "2025-02-20", -700, 0),
+            ("d", 2, "2025-02-10", 99999, 1),
+            ("e", 1, "2025-03-05", -1200, 1),
+        ]
+        conn.executemany(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, source, is_cleared) "
+            "VALUES (?,?,?,?,'test',?)",
+            rows,
+        )
+        # Clear a pending row via ingestion-style upsert, move one across months, delete one
+        conn.execute(
+            "INSERT INTO transactions(idempotency_key, account_id, posted_at, amount_cents, source, is_cleared) "
+            "VALUES ('c', 1, '2025-02-20', -700, 'test', 1) "
+            "ON CONFLICT(idempotency_key) DO UPDATE SET is_cleared = excluded.is_cleared"
+        )
+        conn.execute("UPDATE transactions SET posted_at = '2025-03-01', amount_cents = -2600 WHERE idempotency_key = 'b'")
+        conn.execute("DELETE FROM transactions WHERE idempotency_key = 'e'")
+        conn.commit()
+
+        for as_of in (date(2024, 12, 31), date(2025, 1, 15), date(2025, 2, 28), date(2025, 3, 1), date(2025, 12, 31)):
+            assert compute_opening_balance_cents(as_of, db_path=db_path, conn=conn) == _brute_force(conn, as_of)
+        assert compute_opening_balance_cents(date(2025, 2, 28), db_path=db_path, conn=conn) == 10000 - 700
+        assert compute_opening_balance_cents(None, db_path=db_path, conn=conn) == 10000 - 700 - 2600
+    finally:
+        conn.close()
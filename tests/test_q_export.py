@@ -123,7 +123,8 @@ def test_export_endpoint_generates_files(tmp_path, monkeypatch):
         assert r.status_code == 200
         data = r.json()
         assert "csv_url" in data and data["csv_url"].startswith("/exports/")
-        # File exists and contains hash string
+        assert data["status"] == "queued"
+        # File exists (TestClient runs background tasks before returning) and contains hash string
         csv_path = Path("localdb/exports") / Path(data["csv_url"]).name
         assert csv_path.exists()
         content = csv_path.read_text(encoding="utf-8")
@@ -142,3 +143,70 @@ def test_export_endpoint_generates_files(tmp_path, monkeypatch):
         html = html_path.read_text(encoding="utf-8")
         assert data2["hash"] in html
 
+
+
+def test_export_reuses_pack_assembly_until_db_changes(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_export_cache.db"
+    _init_test_db(db_path)
+    # Pooled connections switch the DB to WAL on first use; do it up front so
+    # that one-time conversion does not read as a data change
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    app = load_app()
+    import api.q_export as q_export
+
+    monkeypatch.setattr(q_export, "EXPORT_DIR", tmp_path / "exports")
+    calls = []
+    real = q_export.assemble_pack
+
+    def counting(pack, period=None):
+        calls.append((pack, period))
+        return real(pack, period)
+
+    monkeypatch.setattr(q_export, "assemble_pack", counting)
+    body = {"pack": "affordability_snapshot", "period": "3m_full"}
+    with TestClient(app) as client:
+        for fmt in ("csv", "pdf", "both"):
+            assert client.post("/api/q/export", json={**body, "format": fmt}).status_code == 200
+        assert len(calls) == 1
+
+        st = os.stat(db_path)
+        os.utime(db_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert client.post("/api/q/export", json={**body, "format": "csv"}).status_code == 200
+        assert len(calls) == 2
+
+
+def test_export_status_reports_ready_and_failed_writes(tmp_path, monkeypatch):
+    db_path = tmp_path / "budget_export_status.db"
+    _init_test_db(db_path)
+    monkeypatch.setenv("BUDGET_DB_PATH", str(db_path))
+
+    app = load_app()
+    import api.q_export as q_export
+
+    monkeypatch.setattr(q_export, "EXPORT_DIR", tmp_path / "exports")
+
+    def broken_render(pack, *, hash_hex, generated_at_iso):
+        raise RuntimeError("renderer exploded")
+
+    monkeypatch.setattr(q_export, "_render_pdf_html", broken_render)
+    body = {"pack": "affordability_snapshot", "period": "3m_full", "format": "both"}
+    with TestClient(app) as client:
+        data = client.post("/api/q/export", json=body).json()
+        csv_name = Path(data["csv_url"]).name
+        pdf_name = Path(data["pdf_url"]).name
+
+        ok = client.get(f"/api/q/export/status/{csv_name}").json()
+        assert ok["status"] == "ready"
+
+        failed = client.get(f"/api/q/export/status/{pdf_name}").json()
+        assert failed["status"] == "failed"
+        assert "renderer exploded" in failed["error"]
+        assert not (tmp_path / "exports" / pdf_name).exists()
+        assert not (tmp_path / "exports" / f"{pdf_name}.tmp").exists()
+
+        assert client.get("/api/q/export/status/nope.csv").status_code == 404
+        assert client.get(f"/api/q/export/status/{pdf_name}.failed").status_code == 400